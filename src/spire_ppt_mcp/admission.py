@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict
+
+from .exceptions import ServerBusyError
+
+logger = logging.getLogger(__name__)
+
+# name: (concurrency budget, wait queue size)
+DEFAULT_CLASSES = {
+    "heavy": (4, 32),
+    "read": (8, 64),
+    "edit": (16, 256)
+}
+
+class _Budget:
+    """Weighted semaphore with a bounded FIFO wait queue, for coroutines on one event loop."""
+
+    def __init__(self, name:str, limit:int, queue_size:int):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.in_use = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waiters:deque = deque()
+
+    async def acquire(self, weight:int, bounded:bool) -> int:
+        weight = max(1, min(weight, self.limit))
+        if not self._waiters and self.in_use + weight <= self.limit:
+            self.in_use += weight
+            self.admitted += 1
+            return weight
+        if bounded and len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise ServerBusyError(f"Server busy: {len(self._waiters)} {self.name} calls are already waiting, try again later")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((weight, waiter))
+        started = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                self._wake()
+            else:
+                # Granted just before the cancellation arrived
+                self.release(weight)
+            raise
+        waited = time.monotonic() - started
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.admitted += 1
+        return weight
+
+    def release(self, weight:int) -> None:
+        self.in_use -= weight
+        self._wake()
+
+    def _wake(self) -> None:
+        # Strict FIFO: a heavy waiter at the head is not overtaken by lighter ones behind it
+        while self._waiters:
+            weight, waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if self.in_use + weight > self.limit:
+                break
+            self._waiters.popleft()
+            self.in_use += weight
+            waiter.set_result(None)
+
+    def stats(self) -> Dict[str,Any]:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "in_use": self.in_use,
+            "waiting": sum(1 for _, waiter in self._waiters if not waiter.done()),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(1000 * self.total_wait / self.admitted, 3) if self.admitted else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 3)
+        }
+
+class AdmissionController:
+    """
+    Concurrency budgets per tool class, so cheap edits never queue behind renders.
+
+    Every class has a budget of concurrent units and a bounded wait queue.
+    A call takes weight units of its class's budget (capped at the budget)
+    while it runs and waits in FIFO order when they are taken; when the
+    queue is full it is rejected at once with ServerBusyError instead of
+    piling up work and memory.
+    """
+
+    def __init__(self):
+        self._budgets:Dict[str,_Budget] = {
+            name: _Budget(name, limit, queue_size) for name, (limit, queue_size) in DEFAULT_CLASSES.items()
+        }
+
+    def configure(self, name:str, limit:int, queue_size:int) -> None:
+        """Set the budget and queue size of a class. Calls already admitted keep their units."""
+        budget = self._budgets.get(name)
+        if budget is None:
+            budget = self._budgets[name] = _Budget(name, 1, 0)
+        budget.limit = max(1, limit)
+        budget.queue_size = max(0, queue_size)
+        budget._wake()
+
+    async def acquire(self, name:str, weight:int = 1, bounded:bool = True) -> int:
+        """
+        Wait for weight units of the class's budget and return the units taken, to be passed to release().
+
+        Raises ServerBusyError if the wait queue is full; bounded=False waits regardless,
+        for work that is already queued elsewhere.
+        """
+        return await self._budgets[name].acquire(weight, bounded)
+
+    def release(self, name:str, units:int) -> None:
+        self._budgets[name].release(units)
+
+    def limit(self, name:str) -> int:
+        return self._budgets[name].limit
+
+    def stats(self) -> Dict[str,Any]:
+        return {name: budget.stats() for name, budget in self._budgets.items()}
+
+admission = AdmissionController()
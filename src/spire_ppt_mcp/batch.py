@@ -0,0 +1,119 @@
+import logging
+from typing import Any, Callable, Dict, List
+
+from .cache import presentation_cache
+from .chart import add_chart
+from .exceptions import BatchError, ConversionError, PptMCPError
+from .shape import (
+    add_shape,
+    add_shapes,
+    add_text_shape,
+    append_html,
+    delete_shape,
+    fill_shape_with_picture,
+    group_shapes,
+    set_alignment,
+    set_autofittext,
+    set_text_color,
+    set_verticaltext,
+    ungroup_shapes
+)
+from .slide import (
+    add_image_in_master,
+    append_slide,
+    change_slide_position,
+    delete_slide
+)
+from .smartart import create_smartart
+from .table import add_text_table, create_table, fill_table, paginate_table
+
+logger = logging.getLogger(__name__)
+
+# Operation names match the MCP tool names; every impl takes the file path first
+OPERATIONS:Dict[str,Callable[...,Any]] = {
+    "create_slide": append_slide,
+    "delete_slide": delete_slide,
+    "change_slide_position": change_slide_position,
+    "add_image_in_master": add_image_in_master,
+    "add_shape": add_shape,
+    "add_shapes": add_shapes,
+    "delete_shape": delete_shape,
+    "add_text_shape": add_text_shape,
+    "set_shape_fill_picture": fill_shape_with_picture,
+    "group_shapes": group_shapes,
+    "ungroup_shapes": ungroup_shapes,
+    "set_alignment": set_alignment,
+    "append_html": append_html,
+    "set_autofittext": set_autofittext,
+    "set_verticaltext": set_verticaltext,
+    "set_text_color": set_text_color,
+    "add_chart": add_chart,
+    "create_smartart": create_smartart,
+    "create_table": create_table,
+    "add_text_table": add_text_table,
+    "fill_table": fill_table,
+    "create_paginated_table": paginate_table
+}
+
+def apply_operations(
+        filepath:str,
+        operations:List[Dict[str,Any]]
+) -> dict[str,Any]:
+    """
+    Apply an ordered list of operations to one loaded presentation and save it once.
+
+    Each operation is a dict with an "op" key naming the operation and the
+    operation's arguments (without the file path) as the remaining keys.
+    The batch is a transaction: the first failing operation, whether it
+    raises or returns a result with success False, discards every change
+    made by the batch and nothing is saved.
+    """
+    if not isinstance(operations, list):
+        raise BatchError("operations must be a list")
+
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+            name = operation.get("op") if isinstance(operation, dict) else operation
+            raise BatchError(f"operation {index}: unknown operation {name!r}")
+
+    try:
+        # Pending write-back edits are saved first so a rollback only loses this batch
+        presentation_cache.flush(filepath)
+    except Exception as e:
+        logger.error(f"batch failed: {e}")
+        raise BatchError(str(e))
+
+    results = []
+    with presentation_cache.hold(filepath):
+        for index, operation in enumerate(operations):
+            name = operation["op"]
+            args = {k: v for k, v in operation.items() if k != "op"}
+            try:
+                result = OPERATIONS[name](filepath, **args)
+                # Some operations report failure in their result instead of raising
+                if isinstance(result, dict) and result.get("success") is False:
+                    raise BatchError(result.get("message") or "operation reported failure")
+            except (PptMCPError, ConversionError, TypeError) as e:
+                presentation_cache.discard(filepath)
+                logger.error(f"batch operation {index} ({name}) failed: {e}")
+                results.append({"index": index, "op": name, "success": False, "error": str(e)})
+                return {
+                    "success": False,
+                    "message": f"Operation {index} ({name}) failed, no changes were saved: {e}",
+                    "results": results
+                }
+            results.append({"index": index, "op": name, "success": True, "result": result})
+
+        try:
+            if not presentation_cache.write_back:
+                presentation_cache.flush(filepath)
+        except Exception as e:
+            presentation_cache.discard(filepath)
+            logger.error(f"batch save failed: {e}")
+            raise BatchError(str(e))
+
+    return {
+        "success": True,
+        "message": f"Applied {len(results)} operation(s)",
+        "results": results
+    }
@@ -0,0 +1,354 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+
+from spire.presentation import *
+
+from .exceptions import PresentationConflictError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 8
+
+def file_stamp(filepath:str) -> Tuple[int,int]:
+    """Return the (mtime_ns, size) pair used to detect on-disk changes."""
+    st = os.stat(filepath)
+    return (st.st_mtime_ns, st.st_size)
+
+class _CacheEntry:
+    __slots__ = ("presentation", "stamp", "dirty", "file_format", "modified_at", "snapshot")
+
+    def __init__(self, presentation:Presentation, stamp:Tuple[int,int]):
+        self.presentation = presentation
+        self.stamp = stamp
+        self.dirty = False
+        self.file_format = FileFormat.Pptx2019
+        self.modified_at = 0.0
+        self.snapshot = None
+
+class PresentationCache:
+    """
+    LRU cache of loaded presentations shared by all tool implementations.
+
+    Entries are keyed by the resolved file path and validated against the
+    file's mtime and size on every lookup, so a deck that was changed on disk
+    by someone else is reloaded instead of served stale. If the entry has
+    unflushed edits, the lookup and automatic flushes raise
+    PresentationConflictError instead of letting either side silently win.
+
+    With write_back enabled, save() only marks the cached presentation dirty;
+    the file is written by flush(), or by whoever polls idle_paths() and
+    calls flush_all(). Dirty entries are not evicted, so the cache may hold
+    more than max_entries until they are flushed. hold() gives the same deferred
+    behaviour to a single file for the duration of a batch of edits.
+    A failed edit never leaves its partial changes behind: invalidate()
+    drops the entry, or rolls it back to the snapshot checkpoint() took of
+    the earlier unflushed edits.
+    """
+
+    def __init__(self, max_entries:int = DEFAULT_MAX_ENTRIES, write_back:bool = False):
+        self.max_entries = max_entries
+        self.write_back = write_back
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+        self.deferred_saves = 0
+        self.snapshots = 0
+        self.rollbacks = 0
+        self._entries:"OrderedDict[str,_CacheEntry]" = OrderedDict()
+        self._held:Dict[str,int] = {}
+        self._pins:Dict[str,int] = {}
+        self._users:Dict[str,threading.RLock] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(filepath:str) -> str:
+        return os.path.realpath(filepath)
+
+    def get(self, filepath:str) -> Presentation:
+        """Return the loaded presentation for filepath, loading it on a miss."""
+        key = self.key(filepath)
+        stamp = file_stamp(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.stamp == stamp:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.presentation
+                if entry.dirty:
+                    raise self._conflict(key)
+                logger.info(f"Presentation changed on disk, reloading: {key}")
+                del self._entries[key]
+            self.misses += 1
+
+        ppt = Presentation()
+        ppt.LoadFromFile(key)
+        self._store(key, _CacheEntry(ppt, stamp))
+        return ppt
+
+    def save(self, ppt:Presentation, filepath:str, file_format:FileFormat = FileFormat.Pptx2019) -> None:
+        """
+        Save ppt to filepath and keep it cached under the new file stamp.
+
+        In write-back mode, or while the file is held, an existing file is not
+        written; the entry is marked dirty and written later by flush().
+        """
+        key = self.key(filepath)
+        if self._defers(key) and os.path.exists(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None or entry.presentation is not ppt:
+                    entry = _CacheEntry(ppt, file_stamp(key))
+                entry.dirty = True
+                entry.file_format = file_format
+                entry.modified_at = time.monotonic()
+                self.deferred_saves += 1
+            self._store(key, entry)
+            return
+
+        ppt.SaveToFile(filepath,file_format)
+        with self._lock:
+            self.saves += 1
+        self._store(key, _CacheEntry(ppt, file_stamp(key)))
+
+    @contextmanager
+    def pinned(self, filepath:str):
+        """
+        Protect filepath's entry from eviction while a call is using it.
+
+        Calls pinning the same file run one at a time: a loaded Presentation
+        is not safe to use from several threads, and concurrent readers of a
+        file share one cached copy.
+        """
+        key = self.key(filepath)
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+            user_lock = self._users.setdefault(key, threading.RLock())
+        try:
+            with user_lock:
+                yield
+        finally:
+            with self._lock:
+                self._pins[key] -= 1
+                if self._pins[key] == 0:
+                    del self._pins[key]
+                    del self._users[key]
+                self._evict()
+
+    @contextmanager
+    def hold(self, filepath:str):
+        """
+        Keep filepath cached and defer its saves while the block runs.
+
+        The entry is never evicted while held. Pending edits are left dirty on
+        exit; the caller decides whether to flush() or discard() them.
+        """
+        key = self.key(filepath)
+        with self._lock:
+            self._held[key] = self._held.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._held[key] -= 1
+                if self._held[key] == 0:
+                    del self._held[key]
+                self._evict()
+
+    @contextmanager
+    def checkpoint(self, filepath:str):
+        """
+        Make an edit of filepath atomic in the cache.
+
+        If the entry has unflushed edits, they are snapshotted to a temporary
+        file first, so that invalidate() during the block rolls back to them
+        instead of losing them. If the block raises, the entry is invalidated.
+        Held entries are left to their holder.
+        """
+        key = self.key(filepath)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.dirty or key in self._held:
+                entry = None
+        snapshot = edited = None
+        if entry is not None:
+            fd, snapshot = tempfile.mkstemp(prefix="spire-ppt-snapshot-", suffix=".pptx")
+            os.close(fd)
+            try:
+                entry.presentation.SaveToFile(snapshot, entry.file_format)
+            except BaseException:
+                os.remove(snapshot)
+                raise
+            with self._lock:
+                entry.snapshot = snapshot
+                edited = entry.presentation
+                self.snapshots += 1
+        try:
+            yield
+        except BaseException:
+            with self._lock:
+                rolled_back = entry is not None and entry.presentation is not edited
+            if not rolled_back:
+                self.invalidate(filepath)
+            raise
+        finally:
+            if entry is not None:
+                with self._lock:
+                    entry.snapshot = None
+                os.remove(snapshot)
+
+    def is_dirty(self, filepath:str) -> bool:
+        with self._lock:
+            entry = self._entries.get(self.key(filepath))
+            return entry is not None and entry.dirty
+
+    def flush(self, filepath:str, force:bool = False) -> bool:
+        """
+        Write pending edits of filepath to disk. Returns True if a save happened.
+
+        Raises PresentationConflictError if the file changed on disk since it
+        was loaded, unless force overwrites that change with the edits.
+        """
+        key = self.key(filepath)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.dirty:
+                return False
+        self._write(key, entry, force)
+        with self._lock:
+            self._evict()
+        return True
+
+    def dirty_paths(self) -> List[str]:
+        with self._lock:
+            return [key for key, entry in self._entries.items() if entry.dirty]
+
+    def idle_paths(self, delay:float) -> List[str]:
+        """Return dirty entries that have not been modified for delay seconds."""
+        now = time.monotonic()
+        with self._lock:
+            return [key for key, entry in self._entries.items()
+                    if entry.dirty and now - entry.modified_at >= delay]
+
+    def flush_all(self) -> List[str]:
+        """Flush every dirty entry, e.g. at shutdown."""
+        flushed = []
+        for key in self.dirty_paths():
+            try:
+                if self.flush(key):
+                    flushed.append(key)
+            except Exception as e:
+                logger.error(f"Failed to flush presentation {key}: {e}")
+        return flushed
+
+    def invalidate(self, filepath:str) -> None:
+        """
+        Drop the cached copy of filepath after a failed edit, which may have changed it.
+
+        Inside checkpoint(), an entry with unflushed edits is rolled back to
+        its snapshot instead, so the earlier deferred edits survive. Held
+        entries are left to the holder, which decides whether to flush or
+        discard them.
+        """
+        key = self.key(filepath)
+        with self._lock:
+            if key in self._held:
+                return
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            if entry.snapshot is None:
+                if entry.dirty:
+                    logger.error(f"Dropping unflushed edits of a presentation after a failed edit: {key}")
+                del self._entries[key]
+                return
+            snapshot = entry.snapshot
+        ppt = Presentation()
+        ppt.LoadFromFile(snapshot)
+        with self._lock:
+            entry.presentation = ppt
+            self.rollbacks += 1
+        logger.info(f"Rolled back a failed edit to the unflushed edits before it: {key}")
+
+    def discard(self, filepath:str) -> None:
+        """Drop any cached copy of filepath, including unflushed edits."""
+        with self._lock:
+            self._entries.pop(self.key(filepath), None)
+
+    def clear(self) -> None:
+        self.flush_all()
+        with self._lock:
+            self._entries.clear()
+
+    def resize(self, max_entries:int) -> None:
+        with self._lock:
+            self.max_entries = max(0, max_entries)
+            self._evict()
+
+    def stats(self) -> Dict[str,Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "dirty": sum(1 for entry in self._entries.values() if entry.dirty),
+                "max_entries": self.max_entries,
+                "write_back": self.write_back,
+                "hits": self.hits,
+                "misses": self.misses,
+                "saves": self.saves,
+                "deferred_saves": self.deferred_saves,
+                "snapshots": self.snapshots,
+                "rollbacks": self.rollbacks
+            }
+
+    def _conflict(self, key:str) -> PresentationConflictError:
+        logger.error(f"Presentation changed on disk while it has unflushed edits: {key}")
+        return PresentationConflictError(
+            f"{key} was changed on disk while it has unflushed edits; "
+            f"call flush_presentation to overwrite the change with the edits"
+        )
+
+    def _write(self, key:str, entry:_CacheEntry, force:bool = False) -> None:
+        with self._lock:
+            modified_at = entry.modified_at
+            stamp = entry.stamp
+        if not force and os.path.exists(key) and file_stamp(key) != stamp:
+            raise self._conflict(key)
+        entry.presentation.SaveToFile(key,entry.file_format)
+        with self._lock:
+            entry.stamp = file_stamp(key)
+            # An edit that landed while we were saving keeps the entry dirty
+            entry.dirty = entry.modified_at != modified_at
+            self.saves += 1
+        logger.info(f"Flushed presentation: {key}")
+
+    def _defers(self, key:str) -> bool:
+        with self._lock:
+            if key in self._held:
+                return True
+            return self.write_back and self.max_entries > 0
+
+    def _store(self, key:str, entry:_CacheEntry) -> None:
+        with self._lock:
+            if self.max_entries <= 0 and key not in self._held and not entry.dirty:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self) -> None:
+        # Entries with unflushed edits stay: they are written by flush() under
+        # the file's locks, never from whichever thread triggered an eviction
+        candidates = [key for key, entry in self._entries.items()
+                      if key not in self._held and key not in self._pins and not entry.dirty]
+        excess = len(self._entries) - self.max_entries
+        for key in candidates[:max(0, excess)]:
+            del self._entries[key]
+            logger.debug(f"Evicted presentation from cache: {key}")
+
+presentation_cache = PresentationCache()
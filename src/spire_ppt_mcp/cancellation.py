@@ -0,0 +1,35 @@
+import contextvars
+import threading
+from typing import Optional
+
+from .exceptions import OperationCancelledError
+
+class CancelToken:
+    """Cancellation flag shared between a tool call on the event loop and the thread doing its work."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+_current_token:contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar("spire_ppt_cancel_token", default=None)
+
+def set_cancel_token(token:CancelToken) -> None:
+    """Make token the current call's cancellation flag, in the current context."""
+    _current_token.set(token)
+
+def check_cancelled() -> None:
+    """
+    Raise OperationCancelledError if the call running this code was cancelled.
+
+    Long loops call it between slides or shapes. Outside a cancellable call,
+    e.g. in a render worker process, it does nothing.
+    """
+    token = _current_token.get()
+    if token is not None and token.cancelled:
+        raise OperationCancelledError("Operation cancelled")
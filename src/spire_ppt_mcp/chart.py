@@ -1,12 +1,139 @@
 import logging
-from typing import Any
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
 
 from spire.presentation import *
 
-from .exceptions import ChartError
+from .cache import presentation_cache
+from .cancellation import check_cancelled
+from .exceptions import ChartError, OperationCancelledError, TableError
+from .table import DEFAULT_CHUNK_ROWS, chunked, iter_table_rows
 
 logger = logging.getLogger(__name__)
 
+def _column_name(index:int) -> str:
+    """Spreadsheet column letters of a 0-based column index: 0 is A, 26 is AA."""
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord("A") + remainder) + name
+    return name
+
+def _as_list(values:Any) -> list:
+    # NumPy arrays convert to plain Python numbers in one call
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+def _number(value:Any, row:int, col:int) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ChartError(f"data row {row}, column {col}: {value!r} is not a number")
+
+def chart_rows(
+        categories:Any = None,
+        series:Optional[Dict[str,Any]] = None,
+        csv_path:str = None,
+        encoding:str = "utf-8-sig"
+) -> Iterator[list]:
+    """
+    Rows of a chart's data sheet: a header row of series names, then one row per category.
+
+    A CSV file already has that layout: categories in the first column, a
+    series per further column and the series names in the first row. It is
+    read as the rows are consumed.
+    """
+    if csv_path is not None:
+        if categories is not None or series:
+            raise ChartError("Pass either csv_path or categories and series, not both")
+        try:
+            yield from iter_table_rows(csv_path=csv_path, encoding=encoding)
+        except TableError as e:
+            raise ChartError(str(e))
+        return
+    if categories is None or not series:
+        raise ChartError("Chart data needs categories and at least one series")
+    categories = _as_list(categories)
+    columns = []
+    for name, values in series.items():
+        values = _as_list(values)
+        if len(values) != len(categories):
+            raise ChartError(f"series {name!r} has {len(values)} values but there are {len(categories)} categories")
+        columns.append(values)
+    yield [""] + list(series)
+    yield from ([category, *values] for category, *values in zip(categories, *columns))
+
+def write_chart_data(chart:IChart, rows:Iterable[Sequence[Any]], scatter:bool = False) -> Dict[str,int]:
+    """
+    Write rows from chart_rows() into the chart's data sheet and bind the series and categories to them.
+
+    Values are written as numbers, so the sheet needs no parsing. For
+    scatter charts the categories are numeric X values.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if not header or len(header) < 2:
+        raise ChartError("Chart data needs a category column and at least one series column")
+    series_count = len(header) - 1
+
+    # A new chart comes with sample data, cleared below where the new data doesn't cover it
+    sample_rows, sample_cols = chart.Categories.Count + 1, chart.Series.Count + 1
+
+    chart_data = chart.ChartData
+    for col, name in enumerate(header[1:], 1):
+        chart_data[0, col].Text = str(name)
+
+    count = 0
+    for chunk in chunked(rows, DEFAULT_CHUNK_ROWS):
+        check_cancelled()
+        for values in chunk:
+            count += 1
+            if len(values) > len(header):
+                raise ChartError(f"data row {count} has {len(values)} columns but the header has {len(header)}")
+            if scatter:
+                x_value = _number(values[0], count, 0)
+                if x_value is not None:
+                    chart_data[count, 0].NumberValue = x_value
+            else:
+                chart_data[count, 0].Text = "" if values[0] is None else str(values[0])
+            for col, value in enumerate(values[1:], 1):
+                number = _number(value, count, col)
+                if number is not None:
+                    chart_data[count, col].NumberValue = number
+    if count == 0:
+        raise ChartError("Chart data has no rows")
+
+    for row in range(sample_rows):
+        for col in range(sample_cols):
+            if row > count or col > series_count:
+                chart_data[row, col].Text = ""
+
+    # Match the sample chart's series and categories to the data before binding them
+    chart_series = chart.Series
+    for index in range(sample_cols - 2, series_count - 1, -1):
+        chart_series.RemoveAt(index)
+    for index in range(sample_cols - 1, series_count):
+        chart_series.Append(chart_data[0, index + 1])
+    chart_categories = chart.Categories
+    for index in range(sample_rows - 2, count - 1, -1):
+        chart_categories.RemoveAt(index)
+    for index in range(sample_rows - 1, count):
+        chart_categories.Append(chart_data[index + 1, 0])
+
+    last_row = count + 1
+    chart_series.SeriesLabel = chart_data["B1", f"{_column_name(series_count)}1"]
+    chart_categories.CategoryLabels = chart_data["A2", f"A{last_row}"]
+    for index in range(series_count):
+        column = _column_name(index + 1)
+        values_range = chart_data[f"{column}2", f"{column}{last_row}"]
+        if scatter:
+            chart_series[index].XValues = chart_data["A2", f"A{last_row}"]
+            chart_series[index].YValues = values_range
+        else:
+            chart_series[index].Values = values_range
+    return {"categories": count, "series": series_count}
+
 def add_chart(
         filepath:str,
         slide_num:int,
@@ -14,12 +141,18 @@ def add_chart(
         y:float = 0,
         width:float = 200,
         height:float = 200,
-        chart_type:str = "Pie"
+        chart_type:str = "Pie",
+        categories:Any = None,
+        series:Optional[Dict[str,Any]] = None,
+        csv_path:str = None
 ) -> dict[str,Any]:
+    """
+    Append a chart. With categories and series (lists or NumPy arrays), or a
+    CSV file, the chart's data sheet is filled and the chart bound to it.
+    """
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
 
@@ -33,15 +166,25 @@ def add_chart(
         if type1 == None:
             type1 = ChartType.Pie
 
-        slide.Shapes.AppendChart(type1,rect)
+        chart = slide.Shapes.AppendChart(type1,rect)
+
+        result = {"message": f"add successfully"}
+        if categories is not None or series or csv_path is not None:
+            scatter = type1.name.startswith("Scatter")
+            result.update(write_chart_data(chart, chart_rows(categories, series, csv_path), scatter))
 
         #Save the document
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
-        return {"message": f"add successfully"}
+        presentation_cache.save(ppt,filepath)
+        return result
 
     except ChartError as e:
+        presentation_cache.invalidate(filepath)
         logger.error(str(e))
         raise
+    except OperationCancelledError:
+        presentation_cache.invalidate(filepath)
+        raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"add failed: {e}")
         raise ChartError(str(e))
\ No newline at end of file
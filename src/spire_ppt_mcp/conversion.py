@@ -1,36 +1,380 @@
+import glob
 import logging
-from typing import Any,Dict
+from typing import Any,Dict,List,Optional
 
 from spire.presentation import *
 
-from .exceptions import ConversionError
+from .cache import presentation_cache
+from .cancellation import check_cancelled
+from .exceptions import ConversionError, OperationCancelledError
+from .fingerprint import manifest_path
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional: without it thumbnails are png only
+    Image = None
 
 logger = logging.getLogger(__name__)
 
-def convert_presentation(
+# Formats rendered slide by slide into one file per slide
+SLIDE_FORMATS = ('image', 'svg', 'thumbnail')
+
+# Formats written to one file, with their file extensions
+FILE_FORMATS = {'pdf': 'pdf', 'html': 'html', 'ofd': 'ofd', 'xps': 'xps'}
+
+# Files picked up by a directory-wide conversion
+PRESENTATION_EXTENSIONS = ('.pptx', '.pptm', '.ppt', '.ppsx', '.pps', '.odp')
+
+FILE_FORMAT_TYPES = {
+    'pdf': FileFormat.PDF,
+    'html': FileFormat.Html,
+    'ofd': FileFormat.OFD,
+    'xps': FileFormat.XPS
+}
+
+# Thumbnail encodings and their file extensions
+THUMBNAIL_FORMATS = {'png': 'png', 'jpeg': 'jpg', 'webp': 'webp'}
+
+def thumbnail_options(
+        width:int = None,
+        scale:float = None,
+        image_format:str = None,
+        quality:int = None
+) -> Dict[str,Any]:
+    """
+    Validate thumbnail settings and fill in the defaults.
+
+    A thumbnail is width pixels wide, or scale times the size of the full
+    image export; the height follows the slide's aspect ratio. jpeg and webp
+    are encoded with quality (1-100) and need Pillow.
+    """
+    image_format = (image_format or "jpeg").lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+    if image_format not in THUMBNAIL_FORMATS:
+        raise ConversionError(f"Unsupported thumbnail format: {image_format}, expected one of {', '.join(THUMBNAIL_FORMATS)}")
+    if image_format != "png" and Image is None:
+        raise ConversionError(f"{image_format} thumbnails need Pillow: pip install spire-ppt-mcp-server[thumbnails]")
+    if scale is not None:
+        if scale <= 0:
+            raise ConversionError("Thumbnail scale must be greater than 0")
+        width = None
+    elif width is None:
+        width = 320
+    elif width <= 0:
+        raise ConversionError("Thumbnail width must be greater than 0")
+    quality = 75 if quality is None else quality
+    if not 1 <= quality <= 100:
+        raise ConversionError("Thumbnail quality must be between 1 and 100")
+    return {"width": width, "scale": scale, "image_format": image_format, "quality": quality}
+
+def fan_out_formats(formats:List[str]) -> List[str]:
+    """Normalize and validate the formats of a multi-format conversion, dropping duplicates."""
+    if not formats:
+        raise ConversionError("No formats given")
+    normalized = []
+    for format_type in formats:
+        format_type = format_type.lower()
+        if format_type not in FILE_FORMATS and format_type not in SLIDE_FORMATS:
+            raise ConversionError(f"Unsupported format: {format_type}, expected one of {', '.join([*FILE_FORMATS, *SLIDE_FORMATS])}")
+        if format_type not in normalized:
+            normalized.append(format_type)
+    return normalized
+
+def fan_out_path(output_filepath:str, format_type:str) -> str:
+    """
+    Output path of one format of a multi-format conversion.
+
+    Single-file formats replace the extension of output_filepath with their
+    own; per-slide formats write to its directory, under their own file names.
+    """
+    if format_type in SLIDE_FORMATS:
+        return output_filepath
+    return os.path.splitext(output_filepath)[0] + "." + FILE_FORMATS[format_type]
+
+def find_presentations(source:str, recursive:bool = False) -> tuple[str,List[str]]:
+    """
+    Presentations matched by source: a directory, searched recursively if asked, or a glob
+    pattern in which "**" matches any number of directories. Office lock files (~$*) are skipped.
+
+    Returns:
+    The directory outputs are laid out relative to, and the matching files in sorted order
+    """
+    if any(char in source for char in "*?["):
+        parts = source.replace("\\", "/").split("/")
+        fixed = []
+        for part in parts:
+            if any(char in part for char in "*?["):
+                break
+            fixed.append(part)
+        root = os.sep.join(fixed) or os.curdir
+        candidates = glob.glob(source, recursive=True)
+    elif os.path.isdir(source):
+        root = source
+        pattern = os.path.join(source, "**", "*") if recursive else os.path.join(source, "*")
+        candidates = glob.glob(pattern, recursive=recursive)
+    else:
+        raise ConversionError(f"Directory not found: {source}")
+    files = [path for path in candidates
+             if os.path.isfile(path)
+             and path.lower().endswith(PRESENTATION_EXTENSIONS)
+             and not os.path.basename(path).startswith("~$")]
+    return root, sorted(files)
+
+def batch_output_path(filepath:str, root:str, output_dir:str, format_type:str) -> str:
+    """
+    Output path of one deck of a directory-wide conversion, mirroring its place under root.
+
+    Single-file formats get the deck's name with the format's extension;
+    per-slide formats write to a folder named after the deck.
+    """
+    stem = os.path.splitext(os.path.relpath(filepath, root))[0]
+    if format_type in SLIDE_FORMATS:
+        return os.path.join(output_dir, stem, os.path.basename(stem))
+    return os.path.join(output_dir, stem + "." + FILE_FORMATS[format_type])
+
+def output_is_current(filepath:str, output_filepath:str, format_type:str) -> bool:
+    """
+    Whether the output of converting filepath is newer than the deck itself.
+
+    Per-slide exports are judged by the manifest written when they finish.
+    """
+    if format_type in SLIDE_FORMATS:
+        output_filepath = manifest_path(os.path.dirname(output_filepath), format_type)
+    try:
+        return os.path.getmtime(output_filepath) >= os.path.getmtime(filepath)
+    except OSError:
+        return False
+
+def slide_output_path(output_dir:str, format_type:str, index:int, options:Dict[str,Any] = None) -> str:
+    """Deterministic output file name of one slide for the per-slide formats."""
+    if format_type == 'svg':
+        return os.path.join(output_dir, "ToSVG-"+str(index)+".svg")
+    if format_type == 'thumbnail':
+        extension = THUMBNAIL_FORMATS[(options or thumbnail_options())["image_format"]]
+        return os.path.join(output_dir, "Thumbnail_"+str(index)+"."+extension)
+    return os.path.join(output_dir, "ToImage_img_"+str(index)+".png")
+
+def save_thumbnail(slide:ISlide, slide_size:SizeF, fileName:str, options:Dict[str,Any]) -> None:
+    """Render a slide straight at thumbnail size and encode it."""
+    width = options["width"] or round(slide_size.Width * 96 / 72 * options["scale"])
+    width = max(1, width)
+    height = max(1, round(width * slide_size.Height / slide_size.Width))
+    image = slide.SaveAsImageByWH(width, height)
+    if options["image_format"] == "png":
+        image.Save(fileName)
+        image.Dispose()
+        return
+
+    pngName = fileName + ".png"
+    image.Save(pngName)
+    image.Dispose()
+    try:
+        with Image.open(pngName) as png:
+            rgba = png.convert("RGBA")
+        # jpeg has no alpha channel: flatten transparent areas onto white
+        thumbnail = Image.new("RGB", rgba.size, "white")
+        thumbnail.paste(rgba, mask=rgba.getchannel("A"))
+        thumbnail.save(fileName, options["image_format"].upper(), quality=options["quality"])
+    finally:
+        os.remove(pngName)
+
+def select_slides(slide_count:int, slides:List[int] = None, slide_range:str = None) -> Optional[List[int]]:
+    """
+    Resolve a slide selection to sorted, distinct 0-based slide indices.
+
+    slides lists indices; slide_range is a comma-separated list of indices and
+    inclusive ranges such as "0-4,7". Both may be given and are combined.
+    Returns None when neither is given, meaning every slide.
+    """
+    if slides is None and not slide_range:
+        return None
+    selected = set(slides or [])
+    for part in (slide_range or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                first, last = (int(bound) for bound in part.split("-", 1))
+            else:
+                first = last = int(part)
+        except ValueError:
+            raise ConversionError(f"Invalid slide range: {part}")
+        if first > last:
+            raise ConversionError(f"Invalid slide range: {part}")
+        selected.update(range(first, last + 1))
+    for index in selected:
+        if index < 0 or index >= slide_count:
+            raise ConversionError(f"Slide {index} out of range, the presentation has {slide_count} slides")
+    return sorted(selected)
+
+def extract_slides(ppt:Presentation, slides:List[int]) -> Presentation:
+    """Copy the given slides, with their layouts and masters, into a new presentation."""
+    subset = Presentation()
+    subset.SlideSize.Type = ppt.SlideSize.Type
+    subset.SlideSize.Size = ppt.SlideSize.Size
+    for index in slides:
+        subset.Slides.AppendBySlide(ppt.Slides[index])
+    # Drop the blank slide every new presentation starts with
+    subset.Slides.RemoveAt(0)
+    return subset
+
+def count_slides(filepath:str) -> int:
+    try:
+        return presentation_cache.get(filepath).Slides.Count
+    except Exception as e:
+        logger.error(f"Failed to read Ppt file: {e}")
+        raise ConversionError(f"Failed to read Ppt file: {str(e)}")
+
+def render_slides(
+        filepath:str,
+        format_type:str,
+        output_dir:str,
+        start:int = 0,
+        stop:int = None,
+        options:Dict[str,Any] = None
+) -> List[str]:
+    """
+    Render slides [start, stop) of a presentation to one image, SVG or thumbnail file per slide.
+
+    Runs in render worker processes, where the loaded deck stays cached between jobs.
+
+    Returns:
+    List of written file paths in slide order
+    """
+    try:
+        ppt = presentation_cache.get(filepath)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        if stop is None or stop > ppt.Slides.Count:
+            stop = ppt.Slides.Count
+
+        if format_type == 'thumbnail':
+            options = options or thumbnail_options()
+            slide_size = ppt.SlideSize.Size
+
+        output_files = []
+        for index in range(start, stop):
+            check_cancelled()
+            slide = ppt.Slides[index]
+            fileName = slide_output_path(output_dir, format_type, index, options)
+            if format_type == 'svg':
+                svgStream = slide.SaveToSVG()
+                svgStream.Save(fileName)
+            elif format_type == 'thumbnail':
+                save_thumbnail(slide, slide_size, fileName, options)
+            else:
+                image = slide.SaveAsImage()
+                image.Save(fileName)
+                image.Dispose()
+            output_files.append(fileName)
+        return output_files
+
+    except (ConversionError, OperationCancelledError) as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"Failed to render slides: {e}")
+        raise ConversionError(f"Failed to render slides: {str(e)}")
+
+def conversion_result(
         filepath:str,
         output_filepath:str,
         format_type:str,
+        output_files:List[str] = None
+) -> dict[str,Any]:
+    result = {
+        "message": f"Ppt file successfully converted to {format_type.upper()}: {output_filepath}",
+        "source_file": filepath,
+        "output_file": output_filepath,
+        "format": format_type
+    }
+    if output_files is not None:
+        result["output_files"] = output_files
+    return result
+
+def save_formats(ppt:Presentation, filepath:str, outputs:List[tuple]) -> List[dict[str,Any]]:
+    """
+    Save one loaded presentation to several single-file formats in turn.
+
+    A format that fails gets an error entry; the others are still written.
+    """
+    results = []
+    for format_type, output_filepath in outputs:
+        check_cancelled()
+        try:
+            output_dir = os.path.dirname(output_filepath)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            ppt.SaveToFile(output_filepath, FILE_FORMAT_TYPES[format_type])
+            results.append(conversion_result(filepath, output_filepath, format_type))
+        except Exception as e:
+            logger.error(f"Failed to convert Ppt file to {format_type.upper()}: {e}")
+            # Don't leave a truncated file behind
+            if os.path.exists(output_filepath):
+                os.remove(output_filepath)
+            results.append({
+                "error": f"Failed to convert Ppt file to {format_type.upper()}: {str(e)}",
+                "source_file": filepath,
+                "output_file": output_filepath,
+                "format": format_type
+            })
+    return results
+
+def convert_presentation(
+        filepath:str,
+        output_filepath:str,
+        format_type:str = None,
         options:Dict[str,Any] = None,
+        slides:List[int] = None,
+        formats:List[str] = None
 ) -> dict[str,Any]:
     """
     Convert Ppt presentation different formats.
         
     Args:
     filepath: Source Ppt file path
-    output_filepath: Target output file path
+    output_filepath: Target output file path. For image, svg and thumbnail, one file per slide
+                     is written to the directory of this path
     format_type: Target format (pdf,, html, image, txt, pptx，etc.)
     options: Format-specific options
+    slides: 0-based indices of the slides to convert, see select_slides(). Defaults to all slides;
+            unselected slides are not rendered
+    formats: Convert to all of these formats instead of format_type, loading the presentation
+             once; each is written to fan_out_path(output_filepath, format)
             
     Returns:
-    Dictionary with operation status
+    Dictionary with operation status; with formats, "results" holds one entry per format
     """
+    subset = None
     try:
-        #Create an instance of presentation document
-        ppt = Presentation()
+        if formats is not None:
+            formats = fan_out_formats(formats)
+            ppt = presentation_cache.get(filepath)
+            results = {}
+            for format_type in formats:
+                if format_type in SLIDE_FORMATS:
+                    path = fan_out_path(output_filepath, format_type)
+                    slide_options = options if format_type == 'thumbnail' else None
+                    output_files = []
+                    for index in (slides if slides is not None else range(ppt.Slides.Count)):
+                        output_files.extend(render_slides(filepath, format_type, os.path.dirname(path), index, index + 1, slide_options))
+                    results[format_type] = conversion_result(filepath, path, format_type, output_files)
+            if slides is not None:
+                ppt = subset = extract_slides(ppt, slides)
+            outputs = [(format_type, fan_out_path(output_filepath, format_type))
+                       for format_type in formats if format_type in FILE_FORMATS]
+            for result in save_formats(ppt, filepath, outputs):
+                results[result["format"]] = result
+            return {
+                "message": f"Ppt file converted to {', '.join(format_type.upper() for format_type in formats)}",
+                "source_file": filepath,
+                "results": [results[format_type] for format_type in formats]
+            }
 
         #Load file
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         # Ensure output directory exists
         output_dir = os.path.dirname(output_filepath)
@@ -40,42 +384,32 @@ def convert_presentation(
         # Handle format-specific conversion
         format_type = format_type.lower()
 
-        if format_type == 'pdf':
-            ppt.SaveToFile(output_filepath,FileFormat.PDF)
-
-        elif format_type == 'html':
-            ppt.SaveToFile(output_filepath,FileFormat.Html)
-
-        elif format_type == 'ofd':
-            ppt.SaveToFile(output_filepath,FileFormat.OFD)
+        if slides is not None and format_type in SLIDE_FORMATS:
+            output_files = []
+            for index in slides:
+                output_files.extend(render_slides(filepath, format_type, output_dir, index, index + 1, options))
+            return conversion_result(filepath, output_filepath, format_type, output_files)
 
-        elif format_type == 'xps':
-            ppt.SaveToFile(output_filepath,FileFormat.XPS)
+        if slides is not None:
+            #Export a copy holding only the selected slides
+            ppt = subset = extract_slides(ppt, slides)
 
-        elif format_type == 'svg':
-            for index,slide in enumerate(ppt.Slides):
-                fileName =  "ToSVG-"+str(index)+".svg"
-                svgStream = slide.SaveToSVG()
-                svgStream.Save(fileName)
+        if format_type in FILE_FORMATS:
+            ppt.SaveToFile(output_filepath,FILE_FORMAT_TYPES[format_type])
 
-        elif format_type == 'image':
-            #Save PPT document to images
-            for i, slide in enumerate(ppt.Slides):
-                fileName ="ToImage_img_"+str(i)+".png"
-                image = slide.SaveAsImage()
-                image.Save(fileName)
-                image.Dispose()
+        elif format_type in SLIDE_FORMATS:
+            #Save every slide to its own image, SVG or thumbnail file
+            output_files = render_slides(filepath, format_type, output_dir, options=options)
+            return conversion_result(filepath, output_filepath, format_type, output_files)
 
-        return {
-            "message": f"Ppt file successfully converted to {format_type.upper()}: {output_filepath}",
-            "source_file": filepath,
-            "output_file": output_filepath,
-            "format": format_type
-        }
+        return conversion_result(filepath, output_filepath, format_type)
 
-    except ConversionError as e:
+    except (ConversionError, OperationCancelledError) as e:
         logger.error(str(e))
         raise
     except Exception as e:
         logger.error(f"Failed to convert Ppt file: {e}")
-        raise ConversionError(f"Failed to convert Ppt file: {str(e)}")
\ No newline at end of file
+        raise ConversionError(f"Failed to convert Ppt file: {str(e)}")
+    finally:
+        if subset is not None:
+            subset.Dispose()
\ No newline at end of file
@@ -6,6 +6,10 @@ class PresentationError(PptMCPError):
     """Raised when presentation operations fail."""
     pass
 
+class PresentationConflictError(PresentationError):
+    """Raised when a presentation changed on disk while the cache holds unflushed edits of it."""
+    pass
+
 class SlideError(PptMCPError):
     """Raised when slide operations fail."""
     pass
@@ -26,6 +30,26 @@ class TableError(PptMCPError):
     """Raised when table operations fail."""
     pass
 
+class BatchError(PptMCPError):
+    """Raised when a batch of operations cannot be applied."""
+    pass
+
+class RenderError(PptMCPError):
+    """Raised when a rendering worker fails."""
+    pass
+
+class ServerBusyError(PptMCPError):
+    """Raised when a call is rejected because its tool class's wait queue is full."""
+    pass
+
+class OperationCancelledError(PptMCPError):
+    """Raised inside a worker thread when the call it is working for was cancelled or timed out."""
+    pass
+
+class JobError(PptMCPError):
+    """Raised when a background job cannot be submitted or found."""
+    pass
+
 class ConversionError(Exception):
     """Exception raised for errors during file conversion."""
     pass
\ No newline at end of file
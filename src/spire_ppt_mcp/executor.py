@@ -0,0 +1,176 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .cancellation import CancelToken, set_cancel_token
+from .scheduler import PriorityScheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKER_THREADS = 4
+
+class ToolExecutor:
+    """
+    Bounded thread pool that runs blocking Spire calls off the event loop.
+
+    Tool handlers await run() so the SSE loop keeps serving other clients
+    while a load, save or render is in progress. Calls wait for a thread in
+    a PriorityScheduler rather than in the pool's FIFO queue.
+    """
+
+    def __init__(self, max_workers:int = DEFAULT_WORKER_THREADS):
+        self.max_workers = max_workers
+        self.scheduler = PriorityScheduler(max_workers)
+        self.submitted = 0
+        self.completed = 0
+        self._active = 0
+        self._pool:Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def resize(self, max_workers:int) -> None:
+        """Change the pool size. Takes effect for the next pool that is created."""
+        self.max_workers = max(1, max_workers)
+        self.scheduler.resize(self.max_workers)
+        self.shutdown(wait=False)
+
+    async def run(self, func:Callable[...,Any], /, *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) on a worker thread.
+
+        Cancelling the caller flags the call's CancelToken, so loops in func
+        that call check_cancelled() stop at the next slide; the caller does
+        not wait for that.
+        """
+        return await self._submit(False, func, *args, **kwargs)
+
+    async def run_to_completion(self, func:Callable[...,Any], /, *args, **kwargs) -> Any:
+        """
+        Like run(), but a cancelled caller still waits for func to return before the
+        cancellation propagates, so locks held around the call outlive the work.
+        """
+        return await self._submit(True, func, *args, **kwargs)
+
+    def shutdown(self, wait:bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str,Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self.submitted - self.completed - self._active,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "scheduler": self.scheduler.stats()
+            }
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="spire-ppt-tool")
+            return self._pool
+
+    async def _submit(self, wait:bool, func:Callable[...,Any], /, *args, **kwargs) -> Any:
+        token = CancelToken()
+        context = contextvars.copy_context()
+        context.run(set_cancel_token, token)
+        call = functools.partial(context.run, self._call, func, *args, **kwargs)
+        with self._lock:
+            self.submitted += 1
+        try:
+            await self.scheduler.acquire()
+        except asyncio.CancelledError:
+            with self._lock:
+                self.completed += 1
+            raise
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_pool().submit(call)
+        except BaseException:
+            self.scheduler.release()
+            raise
+        # The thread stays taken until func returns, even if the caller stops waiting
+        future.add_done_callback(lambda _: self.scheduler.release_soon(loop))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            token.cancel()
+            if future.cancelled():
+                # Never started: it won't be counted by _call()
+                with self._lock:
+                    self.completed += 1
+            elif wait:
+                waiter = asyncio.wrap_future(future)
+                while not waiter.done():
+                    try:
+                        await asyncio.wait([waiter])
+                    except asyncio.CancelledError:
+                        continue
+                waiter.exception()
+            raise
+
+    def _call(self, func:Callable[...,Any], /, *args, **kwargs) -> Any:
+        with self._lock:
+            self._active += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self.completed += 1
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a periodic timer fires.
+
+    A responsive loop fires within a millisecond or two; a blocking call on
+    the loop shows up directly as lag of the same length.
+    """
+
+    def __init__(self, interval:float = 0.1):
+        self.interval = interval
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - start - self.interval)
+
+    def record(self, lag:float) -> None:
+        lag = max(0.0, lag)
+        self.samples += 1
+        self.total_lag += lag
+        self.last_lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+            if lag > 1.0:
+                logger.warning(f"Event loop was blocked for {lag:.2f}s")
+
+    def reset(self) -> None:
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+
+    def stats(self) -> Dict[str,Any]:
+        return {
+            "samples": self.samples,
+            "avg_lag_ms": round(1000 * self.total_lag / self.samples, 3) if self.samples else 0.0,
+            "max_lag_ms": round(1000 * self.max_lag, 3),
+            "last_lag_ms": round(1000 * self.last_lag, 3)
+        }
+
+tool_executor = ToolExecutor()
+loop_lag_monitor = LoopLagMonitor()
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import shutil
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_VERSION = "1"
+
+_PKG_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_DOC_RELS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PML = "http://schemas.openxmlformats.org/presentationml/2006/main"
+_DML = "http://schemas.openxmlformats.org/drawingml/2006/main"
+
+# Relationships that don't change how a slide looks: speaker notes, and
+# hyperlinks or actions pointing at other slides
+_IGNORED_RELATIONSHIPS = (_DOC_RELS + "/notesSlide", _DOC_RELS + "/slide")
+
+# Elements whose children are a set: Spire writes the theme's per-script
+# font lists in a different order on every save
+_UNORDERED = {"{%s}majorFont" % _DML, "{%s}minorFont" % _DML}
+
+# Children of a shape tree that describe the tree itself rather than a shape
+_SHAPE_TREE_PROPERTIES = {"{%s}nvGrpSpPr" % _PML, "{%s}grpSpPr" % _PML, "{%s}extLst" % _PML}
+
+class _Package:
+    """Read-only view of the parts and relationships of a pptx package."""
+
+    def __init__(self, archive:zipfile.ZipFile):
+        self.archive = archive
+        self.names = set(archive.namelist())
+        self._digests:Dict[str,str] = {}
+        self._relationships:Dict[str,List[str]] = {}
+
+    def relationships(self, part:str, skip_types=_IGNORED_RELATIONSHIPS) -> Dict[str,str]:
+        """Map of relationship id to target part name for part's internal relationships."""
+        folder, name = posixpath.split(part)
+        rels = posixpath.join(folder, "_rels", name + ".rels")
+        if rels not in self.names:
+            return {}
+        targets = {}
+        for rel in ET.fromstring(self.archive.read(rels)).iter("{%s}Relationship" % _PKG_RELS):
+            if rel.get("TargetMode") == "External" or rel.get("Type") in skip_types:
+                continue
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(folder, target))
+            targets[rel.get("Id")] = target
+        return targets
+
+    def dependencies(self, part:str) -> List[str]:
+        if part not in self._relationships:
+            self._relationships[part] = sorted(set(self.relationships(part).values()))
+        return self._relationships[part]
+
+    def digest(self, part:str) -> str:
+        if part not in self._digests:
+            data = self.archive.read(part) if part in self.names else b""
+            if part.endswith(".xml"):
+                try:
+                    self._digests[part] = _element_digest(ET.fromstring(data))
+                    return self._digests[part]
+                except ET.ParseError:
+                    pass
+            self._digests[part] = hashlib.sha256(data).hexdigest()
+        return self._digests[part]
+
+def _element_digest(element:ET.Element) -> str:
+    sha = hashlib.sha256()
+    sha.update(element.tag.encode("utf-8"))
+    sha.update(json.dumps(sorted(element.attrib.items())).encode("utf-8"))
+    sha.update((element.text or "").encode("utf-8"))
+    children = [_element_digest(child) + (child.tail or "") for child in element]
+    if element.tag in _UNORDERED:
+        children.sort()
+    for child in children:
+        sha.update(child.encode("utf-8"))
+    return sha.hexdigest()
+
+class _Deck:
+    """The presentation part of a package: slide size and slide parts in slide order."""
+
+    def __init__(self, archive:zipfile.ZipFile):
+        self.package = _Package(archive)
+        presentation = "ppt/presentation.xml"
+        root = ET.fromstring(archive.read(presentation))
+        slide_size = root.find("{%s}sldSz" % _PML)
+        self.size = json.dumps(sorted(slide_size.attrib.items())) if slide_size is not None else ""
+        targets = self.package.relationships(presentation, skip_types=())
+        self.slides = [targets.get(slide_id.get("{%s}id" % _DOC_RELS)) for slide_id in root.iter("{%s}sldId" % _PML)]
+
+    def hasher(self):
+        return hashlib.sha256((FINGERPRINT_VERSION + self.size).encode("utf-8"))
+
+    def add_closure(self, sha, parts:List[str], exclude:str = None) -> None:
+        """Hash every part reachable from parts; masters link back to their layouts."""
+        seen, pending = set(), list(parts)
+        while pending:
+            current = pending.pop()
+            if current is None or current in seen:
+                continue
+            seen.add(current)
+            pending.extend(self.package.dependencies(current))
+        for name in sorted(name for name in seen if name != exclude):
+            sha.update(f"{name}:{self.package.digest(name)}\n".encode("utf-8"))
+
+def slide_fingerprints(filepath:str) -> List[str]:
+    """
+    Fingerprint every slide of a pptx file, in slide order.
+
+    A fingerprint covers everything that determines how the slide renders:
+    the slide part, and every part it reaches through its relationships -
+    layout, master, theme, images, charts and other embedded objects - plus
+    the slide size. It is computed from the package on disk, without loading
+    the deck, and does not change when other slides or the notes change.
+    """
+    with zipfile.ZipFile(filepath) as archive:
+        deck = _Deck(archive)
+        fingerprints = []
+        for part in deck.slides:
+            sha = deck.hasher()
+            deck.add_closure(sha, [part], exclude=part)
+            sha.update(f"slide:{deck.package.digest(part) if part else ''}".encode("utf-8"))
+            fingerprints.append(sha.hexdigest())
+        return fingerprints
+
+def shape_fingerprints(filepath:str, slide_index:int) -> List[str]:
+    """
+    Fingerprint every top-level shape of a slide, in the order of slide.Shapes.
+
+    A shape's fingerprint covers its own XML, the parts it references
+    (pictures, charts, embedded objects), the slide's layout, master and
+    theme, and the slide size, so it only changes when something that shape
+    renders from changes, not when a sibling shape is edited.
+    """
+    with zipfile.ZipFile(filepath) as archive:
+        deck = _Deck(archive)
+        part = deck.slides[slide_index]
+        package = deck.package
+        relationships = package.relationships(part)
+        layouts = [target for target in relationships.values() if "slideLayouts/" in target]
+        tree = ET.fromstring(archive.read(part)).find("{%s}cSld/{%s}spTree" % (_PML, _PML))
+        shapes = [] if tree is None else [child for child in tree if child.tag not in _SHAPE_TREE_PROPERTIES]
+
+        fingerprints = []
+        for shape in shapes:
+            sha = deck.hasher()
+            deck.add_closure(sha, layouts)
+            referenced = [relationships[value] for element in shape.iter() for name, value in element.attrib.items()
+                          if name.startswith("{%s}" % _DOC_RELS) and value in relationships]
+            deck.add_closure(sha, referenced)
+            sha.update(f"shape:{_element_digest(shape)}".encode("utf-8"))
+            fingerprints.append(sha.hexdigest())
+        return fingerprints
+
+def read_fingerprints(filepath:str, slide_index:int = None) -> Optional[List[str]]:
+    """
+    slide_fingerprints(), or shape_fingerprints() of slide_index when it is given.
+
+    Returns None if the file is not a readable pptx package.
+    """
+    try:
+        if slide_index is None:
+            return slide_fingerprints(filepath)
+        return shape_fingerprints(filepath, slide_index)
+    except (OSError, KeyError, IndexError, zipfile.BadZipFile, ET.ParseError) as e:
+        logger.warning(f"Cannot fingerprint {filepath}, rendering everything: {e}")
+        return None
+
+def manifest_path(output_dir:str, kind:str) -> str:
+    return os.path.join(output_dir, f".spire-ppt-manifest-{kind}.json")
+
+def load_manifest(output_dir:str, kind:str) -> Optional[Dict[str,Any]]:
+    try:
+        with open(manifest_path(output_dir, kind), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable render manifest in {output_dir}: {e}")
+        return None
+
+def drop_manifest(output_dir:str, kind:str) -> None:
+    """Forget an earlier export to output_dir, e.g. after its files were replaced by other means."""
+    try:
+        os.remove(manifest_path(output_dir, kind))
+    except FileNotFoundError:
+        pass
+
+def save_manifest(output_dir:str, kind:str, options:Dict[str,Any], fingerprints:List[Optional[str]], output_files:List[str]) -> None:
+    """Record the fingerprint behind every output file; None marks a file that is not current."""
+    path = manifest_path(output_dir, kind)
+    staging = path + ".tmp"
+    with open(staging, "w", encoding="utf-8") as f:
+        json.dump({
+            "kind": kind,
+            "options": options or {},
+            "items": [{"fingerprint": fingerprint, "file": os.path.basename(output_file)}
+                      for fingerprint, output_file in zip(fingerprints, output_files) if fingerprint is not None]
+        }, f)
+    os.replace(staging, path)
+
+def reuse_outputs(
+        output_dir:str,
+        kind:str,
+        options:Dict[str,Any],
+        fingerprints:List[str],
+        output_files:List[str],
+        requested:List[int] = None
+) -> List[bool]:
+    """
+    Reuse the files of an earlier export to output_dir for items (slides or shapes) that did not change.
+
+    Items are matched by fingerprint, so an item that moved keeps its render:
+    its old file is moved (or copied, if several items share it) to the new
+    file name. Only requested items (default: all) get files this way; others
+    just keep a file that is still current where it is. Files of items that no
+    longer exist are removed. The manifest is removed until the caller saves a
+    new one, so an interrupted export is never trusted later.
+
+    Returns:
+    For every item, whether its output file is up to date
+    """
+    manifest = load_manifest(output_dir, kind)
+    if manifest is None:
+        return [False] * len(fingerprints)
+    os.remove(manifest_path(output_dir, kind))
+    # Renders made with other options can't be reused, but their files are still cleaned up
+    reusable = manifest.get("kind") == kind and manifest.get("options", {}) == (options or {})
+
+    previous = {}
+    in_place = set()
+    for entry in manifest.get("items", []):
+        path = os.path.join(output_dir, entry["file"])
+        if reusable and os.path.exists(path):
+            previous.setdefault(entry["fingerprint"], path)
+            in_place.add((entry["fingerprint"], path))
+    wanted_items = set(range(len(fingerprints)) if requested is None else requested)
+
+    # Move reused files aside first so renames between items can't clobber each other
+    staged = {}
+    for fingerprint in set(fingerprints) & set(previous):
+        staged[fingerprint] = previous[fingerprint] + ".reuse"
+        os.replace(previous[fingerprint], staged[fingerprint])
+    wanted = set(output_files)
+    for entry in manifest.get("items", []):
+        path = os.path.join(output_dir, entry["file"])
+        if path not in wanted and os.path.exists(path):
+            os.remove(path)
+
+    targets:Dict[str,List[str]] = {}
+    up_to_date = []
+    for index, (fingerprint, output_file) in enumerate(zip(fingerprints, output_files)):
+        reused = fingerprint in staged and (index in wanted_items or (fingerprint, output_file) in in_place)
+        if reused:
+            targets.setdefault(fingerprint, []).append(output_file)
+        up_to_date.append(reused)
+    for fingerprint, source in staged.items():
+        paths = targets.get(fingerprint)
+        if not paths:
+            os.remove(source)
+            continue
+        for path in paths[1:]:
+            shutil.copyfile(source, path)
+        os.replace(source, paths[0])
+    return up_to_date
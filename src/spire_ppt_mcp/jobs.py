@@ -0,0 +1,285 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .exceptions import JobError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_DB = os.path.join(tempfile.gettempdir(), "spire-ppt-mcp-jobs.sqlite3")
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_QUEUE_SIZE = 100
+DEFAULT_JOB_RETENTION_HOURS = 168
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    arguments TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL,
+    total REAL,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+)
+"""
+
+_COLUMNS = ("id", "kind", "arguments", "status", "progress", "total", "message",
+            "result", "error", "created", "started", "finished")
+
+class _JobStore:
+    """The job table in a local SQLite file. Every statement is a small indexed write, cheap enough for the event loop."""
+
+    def __init__(self, db_path:str):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def insert(self, job:Dict[str,Any]) -> None:
+        with self._lock:
+            self._db.execute(
+                f"INSERT INTO jobs ({', '.join(job)}) VALUES ({', '.join('?' * len(job))})",
+                list(job.values())
+            )
+
+    def update(self, job_id:str, **fields) -> None:
+        with self._lock:
+            self._db.execute(
+                f"UPDATE jobs SET {', '.join(name + ' = ?' for name in fields)} WHERE id = ?",
+                [*fields.values(), job_id]
+            )
+
+    def get(self, job_id:str) -> Optional[Dict[str,Any]]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else dict(zip(_COLUMNS, row))
+
+    def ids(self, status:str) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created", (status,))]
+
+    def counts(self) -> Dict[str,int]:
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def prune(self, before:float) -> int:
+        with self._lock:
+            return self._db.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) AND finished < ?",
+                [*FINISHED, before]
+            ).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+class _JobProgress:
+    """Stands in for an MCP Context: records a job's progress notifications in the job table."""
+
+    def __init__(self, store:_JobStore, job_id:str):
+        self.store = store
+        self.job_id = job_id
+
+    async def report_progress(self, progress:float, total:float = None, message:str = None) -> None:
+        self.store.update(self.job_id, progress=progress, total=total, message=message)
+
+class JobManager:
+    """
+    Background queue for long-running tool calls, so clients poll instead of holding a request open.
+
+    A job is a registered handler (an async function taking keyword
+    arguments and ctx) plus JSON arguments. Jobs wait in a bounded queue and
+    run workers at a time on the event loop; the handlers do their heavy
+    work on the executors. The job table lives in a SQLite file: finished
+    jobs keep their result or error across restarts, and jobs that were
+    queued or running when the server stopped are queued again on start().
+    """
+
+    def __init__(self, db_path:str = DEFAULT_JOB_DB, workers:int = DEFAULT_JOB_WORKERS,
+                 queue_size:int = DEFAULT_JOB_QUEUE_SIZE, retention_hours:float = DEFAULT_JOB_RETENTION_HOURS):
+        self.db_path = db_path
+        self.workers = workers
+        self.queue_size = queue_size
+        self.retention_hours = retention_hours
+        self._handlers:Dict[str,Callable[...,Awaitable[Any]]] = {}
+        self._store:Optional[_JobStore] = None
+        self._queue:Optional[asyncio.Queue] = None
+        self._workers:List[asyncio.Task] = []
+        self._running:Dict[str,asyncio.Task] = {}
+        self._cancelled:set = set()
+
+    def configure(self, db_path:str, workers:int, queue_size:int, retention_hours:float) -> None:
+        """Change the settings. Takes effect on the next start()."""
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.retention_hours = max(0.0, retention_hours)
+
+    def register(self, kind:str, handler:Callable[...,Awaitable[Any]]) -> None:
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        """Open the job table, queue unfinished jobs again and start the workers."""
+        self._store = _JobStore(self.db_path)
+        if self.retention_hours > 0:
+            pruned = self._store.prune(time.time() - self.retention_hours * 3600)
+            if pruned:
+                logger.info(f"Removed {pruned} finished job(s) older than {self.retention_hours} hours")
+        self._queue = asyncio.Queue()
+        for job_id in self._store.ids(RUNNING):
+            self._store.update(job_id, status=QUEUED, started=None, progress=None, total=None, message=None)
+        resumed = self._store.ids(QUEUED)
+        for job_id in resumed:
+            self._queue.put_nowait(job_id)
+        if resumed:
+            logger.info(f"Resuming {len(resumed)} unfinished job(s)")
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers. Interrupted jobs stay unfinished and are resumed by the next start()."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def submit(self, kind:str, arguments:Dict[str,Any]) -> Dict[str,Any]:
+        """Queue a job and return its status."""
+        if kind not in self._handlers:
+            raise JobError(f"Unknown job kind: {kind}")
+        store = self._checked_store()
+        # Jobs cancelled while queued stay in the in-memory queue until a worker skips them; count the table instead
+        if store.counts().get(QUEUED, 0) >= self.queue_size:
+            raise JobError(f"Job queue is full ({self.queue_size} jobs waiting), try again later")
+        job_id = uuid.uuid4().hex
+        store.insert({
+            "id": job_id,
+            "kind": kind,
+            "arguments": json.dumps(arguments),
+            "status": QUEUED,
+            "created": time.time()
+        })
+        self._queue.put_nowait(job_id)
+        return self.status(job_id)
+
+    def status(self, job_id:str) -> Dict[str,Any]:
+        job = self._job(job_id)
+        status = {
+            "job_id": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "created": job["created"],
+            "started": job["started"],
+            "finished": job["finished"]
+        }
+        if job["status"] == QUEUED:
+            status["position"] = self._position(job_id)
+        if job["progress"] is not None:
+            status["progress"] = {"progress": job["progress"], "total": job["total"], "message": job["message"]}
+        if job["error"] is not None:
+            status["error"] = job["error"]
+        return status
+
+    def result(self, job_id:str) -> Dict[str,Any]:
+        """The job's status, plus its result once it has succeeded."""
+        job = self._job(job_id)
+        status = self.status(job_id)
+        if job["status"] == SUCCEEDED:
+            status["result"] = json.loads(job["result"])
+        return status
+
+    def cancel(self, job_id:str) -> Dict[str,Any]:
+        """Cancel a queued or running job. Finished jobs are left as they are."""
+        job = self._job(job_id)
+        if job["status"] == QUEUED:
+            self._store.update(job_id, status=CANCELLED, finished=time.time())
+        elif job["status"] == RUNNING and job_id in self._running:
+            self._cancelled.add(job_id)
+            self._running[job_id].cancel()
+        return self.status(job_id)
+
+    def stats(self) -> Dict[str,Any]:
+        counts = self._store.counts() if self._store is not None else {}
+        return {
+            "db_path": self.db_path,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queued": counts.get(QUEUED, 0),
+            "running": len(self._running),
+            "jobs": counts
+        }
+
+    def _checked_store(self) -> _JobStore:
+        if self._store is None:
+            raise JobError("The job queue is not running")
+        return self._store
+
+    def _job(self, job_id:str) -> Dict[str,Any]:
+        job = self._checked_store().get(job_id)
+        if job is None:
+            raise JobError(f"Unknown job: {job_id}")
+        return job
+
+    def _position(self, job_id:str) -> int:
+        # Cancelled jobs stay in the queue until a worker skips them
+        return self._store.ids(QUEUED).index(job_id) + 1
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._store.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                continue
+            await self._run(job)
+
+    async def _run(self, job:Dict[str,Any]) -> None:
+        job_id = job["id"]
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            self._store.update(job_id, status=FAILED, error=f"Unknown job kind: {job['kind']}", finished=time.time())
+            return
+        self._store.update(job_id, status=RUNNING, started=time.time())
+        task = asyncio.ensure_future(handler(**json.loads(job["arguments"]), ctx=_JobProgress(self._store, job_id)))
+        self._running[job_id] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if job_id not in self._cancelled:
+                # Server shutdown: start() queues the job again
+                raise
+            self._store.update(job_id, status=CANCELLED, finished=time.time())
+            logger.info(f"Cancelled job {job_id}")
+        except Exception as e:
+            self._store.update(job_id, status=FAILED, error=str(e), finished=time.time())
+            logger.error(f"Job {job_id} failed: {e}")
+        else:
+            self._store.update(job_id, status=SUCCEEDED, result=json.dumps(result), finished=time.time())
+        finally:
+            self._running.pop(job_id, None)
+            self._cancelled.discard(job_id)
+
+job_manager = JobManager()
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking is available
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCK_DIR = os.path.join(tempfile.gettempdir(), "spire-ppt-mcp-locks")
+
+class _ReadWriteLock:
+    """Writer-preferring readers/writer lock for coroutines on one event loop."""
+
+    def __init__(self):
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+        self.users = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire_read(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self.writer and self.waiting_writers == 0)
+            self.readers += 1
+
+    async def release_read(self) -> None:
+        async with self._cond:
+            self.readers -= 1
+            if self.readers == 0:
+                self._cond.notify_all()
+
+    async def acquire_write(self) -> None:
+        async with self._cond:
+            self.waiting_writers += 1
+            try:
+                await self._cond.wait_for(lambda: not self.writer and self.readers == 0)
+            finally:
+                self.waiting_writers -= 1
+            self.writer = True
+
+    async def release_write(self) -> None:
+        async with self._cond:
+            self.writer = False
+            self._cond.notify_all()
+
+class FileLockManager:
+    """
+    Per-file locks that serialize writers and let readers share access.
+
+    Locks are keyed by resolved path, so calls on different files never wait
+    for each other. Within the server process coroutines wait on an asyncio
+    readers/writer lock; across processes an fcntl advisory lock on a lock
+    file in lock_dir is taken as well (where fcntl is available).
+    """
+
+    def __init__(self, lock_dir:str = DEFAULT_LOCK_DIR, interprocess:bool = True):
+        self.lock_dir = lock_dir
+        self.interprocess = interprocess and fcntl is not None
+        self._locks:Dict[str,_ReadWriteLock] = {}
+
+    @staticmethod
+    def key(filepath:str) -> str:
+        return os.path.realpath(filepath)
+
+    @asynccontextmanager
+    async def read(self, filepath:str):
+        """Shared access: concurrent readers of one file, but no writer."""
+        key = self.key(filepath)
+        lock = self._checkout(key)
+        try:
+            await lock.acquire_read()
+            try:
+                async with self._process_lock(key, shared=True):
+                    yield
+            finally:
+                await lock.release_read()
+        finally:
+            self._checkin(key, lock)
+
+    @asynccontextmanager
+    async def write(self, filepath:str):
+        """Exclusive access to one file."""
+        key = self.key(filepath)
+        lock = self._checkout(key)
+        try:
+            await lock.acquire_write()
+            try:
+                async with self._process_lock(key, shared=False):
+                    yield
+            finally:
+                await lock.release_write()
+        finally:
+            self._checkin(key, lock)
+
+    def stats(self) -> Dict[str,Any]:
+        return {
+            "locked_files": len(self._locks),
+            "readers": sum(lock.readers for lock in self._locks.values()),
+            "writers": sum(1 for lock in self._locks.values() if lock.writer),
+            "waiting_writers": sum(lock.waiting_writers for lock in self._locks.values()),
+            "interprocess": self.interprocess
+        }
+
+    def _checkout(self, key:str) -> _ReadWriteLock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = _ReadWriteLock()
+        lock.users += 1
+        return lock
+
+    def _checkin(self, key:str, lock:_ReadWriteLock) -> None:
+        lock.users -= 1
+        if lock.users == 0 and self._locks.get(key) is lock:
+            del self._locks[key]
+
+    @asynccontextmanager
+    async def _process_lock(self, key:str, shared:bool):
+        if not self.interprocess:
+            yield
+            return
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".lock"
+        fd = os.open(os.path.join(self.lock_dir, name), os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            # Poll with a non-blocking flock so waiting never ties up a thread
+            mode = (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB
+            delay = 0.005
+            while True:
+                try:
+                    fcntl.flock(fd, mode)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 0.2)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+file_locks = FileLockManager()
@@ -4,6 +4,7 @@ from typing import Any
 
 from spire.presentation import *
 
+from .cache import presentation_cache
 from .exceptions import PresentationError
 
 logger = logging.getLogger(__name__)
@@ -16,7 +17,7 @@ def create_presentation(filepath:str) -> dict[str]:
         save_path = Path(filepath)
         save_path.parent.mkdir(parents=True,exist_ok=True)
 
-        ppt.SaveToFile(str(save_path),FileFormat.Pptx2019)
+        presentation_cache.save(ppt,str(save_path))
         return{
             "message":f"Created Presentation:{filepath}",
             "presentation":ppt
@@ -28,10 +29,9 @@ def create_presentation(filepath:str) -> dict[str]:
 def get_or_create_presentation(filepath: str) -> Presentation:
     """Get existing presentation or create new one if it doesn't exist"""
     try:
-        ppt = Presentation()
         if Path(filepath).exists():
             # 加载已有的 PPT 文件
-            ppt.LoadFromFile(filepath)
+            ppt = presentation_cache.get(filepath)
         else:
             # 创建新的 PPT，并确保目录存在
             ppt = create_presentation(filepath)
@@ -40,6 +40,28 @@ def get_or_create_presentation(filepath: str) -> Presentation:
         logger.error(f"Failed to get or create presentation: {e}")
         raise PresentationError(f"Failed to get or create presentation: {e!s}")
     
+def flush_presentation(filepath:str = None) -> dict[str,Any]:
+    """
+    Write deferred edits of one presentation, or of all cached presentations, to disk.
+
+    A named presentation is written even if it changed on disk since it was loaded:
+    flushing it is how a client resolves that conflict in favour of its edits.
+    """
+    try:
+        if filepath is None:
+            flushed = presentation_cache.flush_all()
+        elif presentation_cache.flush(filepath, force=True):
+            flushed = [filepath]
+        else:
+            flushed = []
+        return {
+            "message": f"Flushed {len(flushed)} presentation(s)",
+            "flushed": flushed
+        }
+    except Exception as e:
+        logger.error(f"Failed to flush presentation: {e}")
+        raise PresentationError(f"Failed to flush presentation: {e!s}")
+
 # def create_slide(filepath: str) -> dict:
 #     """
 #     Create a new slide in the presentation with the given title if it doesn't exist.
@@ -0,0 +1,167 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import sys
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from .exceptions import RenderError
+from .scheduler import PriorityScheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RENDER_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_TASKS_PER_WORKER = 100
+DEFAULT_KILL_GRACE = 10.0
+
+def _init_worker() -> None:
+    """Load the Spire runtime once per worker so the first job doesn't pay for it."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s[render-worker] - %(levelname)s - %(message)s"
+    )
+    from spire.presentation import Presentation
+    Presentation().Dispose()
+
+class RenderPool:
+    """
+    Worker process pool for CPU-heavy rendering (conversions, shape images).
+
+    Jobs are module-level functions that take file paths, so they can be
+    pickled to a worker; each worker loads the deck itself. Rendering runs
+    on every core, and a native crash only takes down one worker: the pool
+    is rebuilt and the job fails with RenderError.
+
+    A job whose caller is cancelled, e.g. by a timeout, can't be stopped
+    inside the worker. If it is still running kill_grace seconds later it is
+    taken to be stuck and the pool is replaced, killing its workers; other
+    jobs that were on that pool are run again on the new one.
+    """
+
+    def __init__(self, max_workers:int = DEFAULT_RENDER_WORKERS, max_tasks_per_worker:int = DEFAULT_MAX_TASKS_PER_WORKER,
+                 kill_grace:float = DEFAULT_KILL_GRACE):
+        self.max_workers = max_workers
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.kill_grace = kill_grace
+        self.submitted = 0
+        self.completed = 0
+        self.crashes = 0
+        self.kills = 0
+        self.scheduler = PriorityScheduler(max(1, max_workers))
+        self._pool:Optional[ProcessPoolExecutor] = None
+        self._killed:"weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+        self._reapers:set = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def configure(self, max_workers:int, max_tasks_per_worker:int, kill_grace:float = DEFAULT_KILL_GRACE) -> None:
+        """Change the pool size and recycling. Takes effect for the next pool that is created."""
+        self.max_workers = max(0, max_workers)
+        self.max_tasks_per_worker = max(0, max_tasks_per_worker)
+        self.kill_grace = max(0.0, kill_grace)
+        self.scheduler.resize(self.max_workers)
+        self.shutdown(wait=False)
+
+    async def run(self, func:Callable[...,Any], /, *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) in a worker process and return its result.
+
+        Jobs wait for a worker in a PriorityScheduler, so a job queued by an
+        interactive call starts before earlier bulk jobs.
+        """
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        try:
+            while True:
+                await self.scheduler.acquire()
+                try:
+                    pool = self._get_pool()
+                    future = pool.submit(functools.partial(func, *args, **kwargs))
+                except BaseException:
+                    self.scheduler.release()
+                    raise
+                # The worker stays taken until the job ends, even if the caller stops waiting
+                future.add_done_callback(lambda _: self.scheduler.release_soon(loop))
+                try:
+                    return await asyncio.wrap_future(future)
+                except BrokenProcessPool as e:
+                    if pool in self._killed:
+                        # Replaced because of another, stuck job: this one is innocent
+                        continue
+                    self.crashes += 1
+                    self._discard(pool)
+                    logger.error(f"Rendering worker exited unexpectedly: {e}")
+                    raise RenderError("Rendering worker exited unexpectedly")
+                except asyncio.CancelledError:
+                    if future.running():
+                        self._reap_later(pool, future)
+                    raise
+        finally:
+            self.completed += 1
+
+    def shutdown(self, wait:bool = True) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def stats(self) -> Dict[str,Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_tasks_per_worker": self.max_tasks_per_worker,
+            "kill_grace": self.kill_grace,
+            "running": self._pool is not None,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "crashes": self.crashes,
+            "kills": self.kills,
+            "scheduler": self.scheduler.stats()
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            kwargs = {}
+            # max_tasks_per_child exists from Python 3.11 on
+            if self.max_tasks_per_worker > 0 and sys.version_info >= (3, 11):
+                kwargs["max_tasks_per_child"] = self.max_tasks_per_worker
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                **kwargs
+            )
+        return self._pool
+
+    def _discard(self, pool:ProcessPoolExecutor) -> None:
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _reap_later(self, pool:ProcessPoolExecutor, future:Future) -> None:
+        async def reap():
+            await asyncio.sleep(self.kill_grace)
+            if not future.done() and pool not in self._killed:
+                self._kill(pool)
+
+        reaper = asyncio.ensure_future(reap())
+        self._reapers.add(reaper)
+        reaper.add_done_callback(self._reapers.discard)
+
+    def _kill(self, pool:ProcessPoolExecutor) -> None:
+        """Replace pool, terminating its workers; its unfinished jobs fail with BrokenProcessPool and are retried."""
+        self.kills += 1
+        self._killed.add(pool)
+        if self._pool is pool:
+            self._pool = None
+        logger.warning(f"Cancelled rendering job still running after {self.kill_grace}s, replacing the worker pool")
+        # ProcessPoolExecutor can't stop a single job; terminating the workers breaks the pool
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False)
+
+render_pool = RenderPool()
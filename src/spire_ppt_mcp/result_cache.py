@@ -0,0 +1,240 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import file_stamp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "spire-ppt-mcp-results")
+DEFAULT_RESULT_CACHE_MB = 512
+LINK_MODES = ("copy", "hardlink")
+
+_MANIFEST = "manifest.json"
+_FILES = "files"
+
+class ConversionCache:
+    """
+    Content-addressed cache of conversion outputs on disk.
+
+    An entry is keyed by a hash of the source file's bytes plus the target
+    format and conversion options, so an unchanged deck converted again is
+    served from the cache wherever it lives and whatever its output name.
+    Entries are directories under cache_dir holding the produced files and a
+    manifest; the least recently used ones are removed once the total size
+    exceeds max_bytes. Hits are copied, or hardlinked in "hardlink" mode, to
+    the requested output paths; hardlinked outputs share the cached bytes and
+    must be treated as read-only.
+    """
+
+    def __init__(self, cache_dir:str = DEFAULT_RESULT_CACHE_DIR, max_bytes:int = DEFAULT_RESULT_CACHE_MB * 1024 * 1024, link_mode:str = "copy"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.link_mode = link_mode
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._index:"Optional[OrderedDict[str,int]]" = None
+        self._digests:Dict[str,Tuple[Tuple[int,int],str]] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def configure(self, cache_dir:str, max_bytes:int, link_mode:str) -> None:
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode '{link_mode}', expected one of {', '.join(LINK_MODES)}")
+        with self._lock:
+            self.cache_dir = cache_dir
+            self.max_bytes = max(0, max_bytes)
+            self.link_mode = link_mode
+            self._index = None
+
+    def key(self, filepath:str, format_type:str, options:Dict[str,Any] = None) -> str:
+        """Cache key of converting filepath, as it is on disk, with the given format and options."""
+        description = json.dumps({"format": format_type, "options": options or {}}, sort_keys=True)
+        return hashlib.sha256((self._digest(filepath) + description).encode("utf-8")).hexdigest()
+
+    def fetch(self, key:str, output_filepath:str) -> Optional[List[str]]:
+        """
+        Materialize a cached result at output_filepath.
+
+        Returns the written output files, or None on a miss. Single-file
+        results are written to output_filepath itself; per-slide results keep
+        their file names in the directory of output_filepath.
+        """
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self.misses += 1
+                return None
+            index.move_to_end(key)
+            self.hits += 1
+        entry_dir = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(entry_dir, _MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+            output_files = self._targets(manifest, output_filepath)
+            for name, target in zip(manifest["files"], output_files):
+                self._materialize(os.path.join(entry_dir, _FILES, name), target)
+            os.utime(entry_dir)
+            return output_files
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Dropping unreadable conversion cache entry {key}: {e}")
+            with self._lock:
+                self.hits -= 1
+                self.misses += 1
+                self._remove(key)
+            return None
+
+    def store(self, key:str, output_files:List[str], single:bool) -> bool:
+        """Copy the outputs of a conversion into the cache. Returns False if they don't fit."""
+        size = sum(os.path.getsize(path) for path in output_files)
+        if size > self.max_bytes:
+            return False
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.cache_dir)
+        try:
+            os.makedirs(os.path.join(staging, _FILES))
+            names = [os.path.basename(path) for path in output_files]
+            for path, name in zip(output_files, names):
+                shutil.copyfile(path, os.path.join(staging, _FILES, name))
+            with open(os.path.join(staging, _MANIFEST), "w", encoding="utf-8") as f:
+                json.dump({"files": names, "single": single, "size": size, "created": time.time()}, f)
+            with self._lock:
+                index = self._load_index()
+                if key in index:
+                    return True
+                os.rename(staging, os.path.join(self.cache_dir, key))
+                staging = None
+                index[key] = size
+                self.stores += 1
+                self._evict()
+            return True
+        finally:
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def release(self, output_files:List[str]) -> None:
+        """
+        Unlink outputs that are hardlinks into the cache before they are rendered again.
+
+        Renderers overwrite files in place, which would otherwise rewrite the cached copy.
+        """
+        for path in output_files:
+            try:
+                if os.stat(path).st_nlink > 1:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove(key)
+
+    def stats(self) -> Dict[str,Any]:
+        with self._lock:
+            index = self._index if self._index is not None else {}
+            return {
+                "enabled": self.enabled,
+                "cache_dir": self.cache_dir,
+                "entries": len(index),
+                "bytes": sum(index.values()),
+                "max_bytes": self.max_bytes,
+                "link_mode": self.link_mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions
+            }
+
+    def _digest(self, filepath:str) -> str:
+        key = os.path.realpath(filepath)
+        stamp = file_stamp(key)
+        with self._lock:
+            known = self._digests.get(key)
+            if known is not None and known[0] == stamp:
+                return known[1]
+        sha = hashlib.sha256()
+        with open(key, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with self._lock:
+            self._digests[key] = (stamp, digest)
+        return digest
+
+    def _load_index(self) -> "OrderedDict[str,int]":
+        """Build the LRU index from the entries on disk, oldest use first."""
+        if self._index is None:
+            entries = []
+            if os.path.isdir(self.cache_dir):
+                for name in os.listdir(self.cache_dir):
+                    entry_dir = os.path.join(self.cache_dir, name)
+                    if name.startswith(".staging-"):
+                        shutil.rmtree(entry_dir, ignore_errors=True)
+                        continue
+                    try:
+                        with open(os.path.join(entry_dir, _MANIFEST), encoding="utf-8") as f:
+                            size = json.load(f)["size"]
+                        entries.append((os.stat(entry_dir).st_mtime, name, size))
+                    except (OSError, ValueError, KeyError):
+                        shutil.rmtree(entry_dir, ignore_errors=True)
+            entries.sort()
+            self._index = OrderedDict((name, size) for _, name, size in entries)
+        return self._index
+
+    def _evict(self) -> None:
+        index = self._load_index()
+        total = sum(index.values())
+        while total > self.max_bytes and index:
+            key, size = next(iter(index.items()))
+            self._remove(key)
+            total -= size
+            self.evictions += 1
+            logger.debug(f"Evicted conversion result from cache: {key}")
+
+    def _remove(self, key:str) -> None:
+        self._load_index().pop(key, None)
+        shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+
+    @staticmethod
+    def _targets(manifest:Dict[str,Any], output_filepath:str) -> List[str]:
+        if manifest["single"]:
+            return [output_filepath]
+        output_dir = os.path.dirname(output_filepath)
+        return [os.path.join(output_dir, name) for name in manifest["files"]]
+
+    def _materialize(self, source:str, target:str) -> None:
+        target_dir = os.path.dirname(target)
+        if target_dir:
+            os.makedirs(target_dir, exist_ok=True)
+        # Replace the target atomically so a file linked to another entry is never written through
+        fd, staging = tempfile.mkstemp(prefix=".cache-", dir=target_dir or None)
+        os.close(fd)
+        try:
+            if self.link_mode == "hardlink":
+                try:
+                    os.remove(staging)
+                    os.link(source, staging)
+                except OSError:
+                    shutil.copyfile(source, staging)
+            else:
+                shutil.copyfile(source, staging)
+            os.replace(staging, target)
+        except BaseException:
+            if os.path.exists(staging):
+                os.remove(staging)
+            raise
+
+conversion_cache = ConversionCache()
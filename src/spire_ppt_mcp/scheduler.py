@@ -0,0 +1,132 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Highest priority first
+PRIORITIES = ("interactive", "normal", "bulk")
+
+_current_priority:contextvars.ContextVar[str] = contextvars.ContextVar("spire_ppt_priority", default="normal")
+_current_session:contextvars.ContextVar[Optional[Hashable]] = contextvars.ContextVar("spire_ppt_session", default=None)
+
+@contextmanager
+def call_priority(priority:str, session:Hashable = None):
+    """Schedule the work started in this block, including tasks it spawns, with priority on behalf of session."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+    priority_token = _current_priority.set(priority)
+    session_token = _current_session.set(session)
+    try:
+        yield
+    finally:
+        _current_session.reset(session_token)
+        _current_priority.reset(priority_token)
+
+class _PriorityClass:
+    """Waiters of one priority, queued per session and served round-robin across sessions."""
+
+    def __init__(self):
+        self.sessions:"OrderedDict[Hashable,deque]" = OrderedDict()
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def next_waiter(self):
+        while self.sessions:
+            session, waiters = next(iter(self.sessions.items()))
+            waiter, enqueued = waiters.popleft()
+            if waiters:
+                self.sessions.move_to_end(session)
+            else:
+                del self.sessions[session]
+            if not waiter.done():
+                return waiter, enqueued
+        return None
+
+    def record(self, waited:float) -> None:
+        self.granted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def stats(self) -> Dict[str,Any]:
+        waiting = {session: sum(1 for waiter, _ in waiters if not waiter.done()) for session, waiters in self.sessions.items()}
+        return {
+            "queued": sum(waiting.values()),
+            "sessions": sum(1 for count in waiting.values() if count),
+            "granted": self.granted,
+            "avg_wait_ms": round(1000 * self.total_wait / self.granted, 3) if self.granted else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 3)
+        }
+
+class PriorityScheduler:
+    """
+    Hands out a fixed number of execution slots by priority, fairly across sessions.
+
+    A free slot goes to the highest priority class with waiters; within a
+    class, sessions take turns, so one client's burst doesn't starve the
+    others. Executors acquire a slot before handing work to their pool, so
+    the pool's own FIFO queue never builds up and an interactive edit
+    waits at most for a running item, never for a backlog of bulk work.
+    The priority and session come from call_priority().
+    """
+
+    def __init__(self, slots:int):
+        self.slots = slots
+        self.in_use = 0
+        self._classes:Dict[str,_PriorityClass] = {priority: _PriorityClass() for priority in PRIORITIES}
+
+    def resize(self, slots:int) -> None:
+        self.slots = max(1, slots)
+        self._dispatch()
+
+    async def acquire(self) -> None:
+        """Wait for a slot; the holder calls release() once its work has finished."""
+        priority_class = self._classes[_current_priority.get()]
+        waiter = asyncio.get_running_loop().create_future()
+        priority_class.sessions.setdefault(_current_session.get(), deque()).append((waiter, time.monotonic()))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if not waiter.cancelled():
+                # Granted just before the cancellation arrived
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_use -= 1
+        self._dispatch()
+
+    def release_soon(self, loop:asyncio.AbstractEventLoop) -> None:
+        """release() from another thread, e.g. a pool's completion callback."""
+        try:
+            loop.call_soon_threadsafe(self.release)
+        except RuntimeError:
+            # The loop is closed: nobody is waiting anymore
+            pass
+
+    def stats(self) -> Dict[str,Any]:
+        return {
+            "slots": self.slots,
+            "in_use": self.in_use,
+            "classes": {priority: priority_class.stats() for priority, priority_class in self._classes.items()}
+        }
+
+    def _dispatch(self) -> None:
+        while self.in_use < self.slots:
+            for priority in PRIORITIES:
+                priority_class = self._classes[priority]
+                next_waiter = priority_class.next_waiter()
+                if next_waiter is not None:
+                    waiter, enqueued = next_waiter
+                    self.in_use += 1
+                    priority_class.record(time.monotonic() - enqueued)
+                    waiter.set_result(None)
+                    break
+            else:
+                return
@@ -1,27 +1,64 @@
+import asyncio
+import contextvars
+import functools
 import logging
 import sys
 import os
+import time
+from contextlib import asynccontextmanager
 from typing import Any,List,Dict,Optional
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
 from .exceptions import(
     PresentationError,
+    BatchError,
+    RenderError,
     SlideError,
     ShapeError,
     ChartError,
     SmartArtError,
     TableError,
-    ConversionError
+    ConversionError,
+    JobError,
+    ServerBusyError
 )
 
+from .admission import admission
+from .cache import presentation_cache
+from .executor import loop_lag_monitor, tool_executor
+from .jobs import job_manager
+from .locks import file_locks
+from .rendering import render_pool
+from .result_cache import conversion_cache
+from .scheduler import call_priority
+from .singleflight import singleflight
+from .fingerprint import drop_manifest, read_fingerprints, reuse_outputs, save_manifest
 from .presentation import get_or_create_presentation
+from .presentation import flush_presentation as flush_presentation_impl
 from .slide import append_slide as create_slide_impl
 from .shape import add_shape as add_shape_impl
+from .shape import count_shapes as count_shapes_impl
+from .shape import shape_image_dir, shape_output_path
+from .shape import shape_to_image as shape_to_image_impl
 from .chart import add_chart as add_chart_impl
 from .smartart import create_smartart as create_smartart_impl
 from .table import create_table as create_table_impl
 from .conversion import convert_presentation as convert_presentation_impl
+from .conversion import (
+    SLIDE_FORMATS,
+    batch_output_path,
+    conversion_result,
+    fan_out_formats,
+    fan_out_path,
+    count_slides as count_slides_impl,
+    find_presentations,
+    output_is_current,
+    render_slides as render_slides_impl,
+    select_slides,
+    slide_output_path,
+    thumbnail_options
+)
 
 # Configure logging
 logging.basicConfig(
@@ -39,6 +76,71 @@ logger = logging.getLogger("spire-ppt-mcp")
 # Get Ppt files path from environment or use default
 PPT_FILES_PATH = os.environ.get("PPT_FILES_PATH", "./ppt_files")
 
+# Maximum number of loaded presentations kept in memory between tool calls
+PPT_CACHE_SIZE = int(os.environ.get("PPT_CACHE_SIZE", "8"))
+presentation_cache.resize(PPT_CACHE_SIZE)
+
+# Defer saves of edited presentations until flush_presentation,
+# shutdown or PPT_FLUSH_DELAY seconds without further edits
+PPT_WRITE_BACK = os.environ.get("PPT_WRITE_BACK", "false").lower() in ("1", "true", "yes")
+PPT_FLUSH_DELAY = float(os.environ.get("PPT_FLUSH_DELAY", "2.0"))
+presentation_cache.write_back = PPT_WRITE_BACK
+
+# Number of threads running blocking Spire calls off the SSE event loop
+PPT_WORKER_THREADS = int(os.environ.get("PPT_WORKER_THREADS", "4"))
+tool_executor.resize(PPT_WORKER_THREADS)
+
+# Directory for the advisory lock files shared with other server processes
+PPT_LOCK_DIR = os.environ.get("PPT_LOCK_DIR", file_locks.lock_dir)
+file_locks.lock_dir = PPT_LOCK_DIR
+
+# Worker processes for conversions and shape images (0 renders in the server process);
+# each worker is replaced after PPT_RENDER_MAX_TASKS jobs (0 never replaces it), and the
+# workers are replaced when a cancelled job is still running PPT_RENDER_KILL_GRACE seconds later
+PPT_RENDER_WORKERS = int(os.environ.get("PPT_RENDER_WORKERS", str(render_pool.max_workers)))
+PPT_RENDER_MAX_TASKS = int(os.environ.get("PPT_RENDER_MAX_TASKS", str(render_pool.max_tasks_per_worker)))
+PPT_RENDER_KILL_GRACE = float(os.environ.get("PPT_RENDER_KILL_GRACE", str(render_pool.kill_grace)))
+render_pool.configure(PPT_RENDER_WORKERS, PPT_RENDER_MAX_TASKS, PPT_RENDER_KILL_GRACE)
+
+# Content-addressed cache of conversion outputs (PPT_RESULT_CACHE_MB=0 disables it);
+# hits are copied to the output path, or hardlinked with PPT_RESULT_CACHE_LINK=hardlink
+PPT_RESULT_CACHE_DIR = os.environ.get("PPT_RESULT_CACHE_DIR", conversion_cache.cache_dir)
+PPT_RESULT_CACHE_MB = int(os.environ.get("PPT_RESULT_CACHE_MB", "512"))
+PPT_RESULT_CACHE_LINK = os.environ.get("PPT_RESULT_CACHE_LINK", "copy").lower()
+conversion_cache.configure(PPT_RESULT_CACHE_DIR, PPT_RESULT_CACHE_MB * 1024 * 1024, PPT_RESULT_CACHE_LINK)
+
+# Share one execution between identical concurrent read-only calls on an unchanged file
+PPT_COALESCE = os.environ.get("PPT_COALESCE", "true").lower() in ("1", "true", "yes")
+singleflight.enabled = PPT_COALESCE
+
+# Concurrency budget and wait-queue size per tool class: renders ("heavy"), read-only
+# calls ("read") and edits ("edit"); calls beyond a full queue get a server busy error
+PPT_HEAVY_CONCURRENCY = int(os.environ.get("PPT_HEAVY_CONCURRENCY", str(admission.limit("heavy"))))
+PPT_HEAVY_QUEUE = int(os.environ.get("PPT_HEAVY_QUEUE", "32"))
+PPT_READ_CONCURRENCY = int(os.environ.get("PPT_READ_CONCURRENCY", str(admission.limit("read"))))
+PPT_READ_QUEUE = int(os.environ.get("PPT_READ_QUEUE", "64"))
+PPT_EDIT_CONCURRENCY = int(os.environ.get("PPT_EDIT_CONCURRENCY", str(admission.limit("edit"))))
+PPT_EDIT_QUEUE = int(os.environ.get("PPT_EDIT_QUEUE", "256"))
+admission.configure("heavy", PPT_HEAVY_CONCURRENCY, PPT_HEAVY_QUEUE)
+admission.configure("read", PPT_READ_CONCURRENCY, PPT_READ_QUEUE)
+admission.configure("edit", PPT_EDIT_CONCURRENCY, PPT_EDIT_QUEUE)
+
+# Seconds after which a tool call is cancelled (0: no limit), and per-tool overrides
+# as "convert_pptx=600,shape_to_image=120"
+PPT_TOOL_TIMEOUT = float(os.environ.get("PPT_TOOL_TIMEOUT", "0"))
+PPT_TOOL_TIMEOUTS = {
+    name.strip(): float(seconds)
+    for name, seconds in (item.split("=", 1) for item in os.environ.get("PPT_TOOL_TIMEOUTS", "").split(",") if "=" in item)
+}
+
+# Background conversion jobs: PPT_JOB_WORKERS run at a time, at most PPT_JOB_QUEUE_SIZE wait;
+# the job table in PPT_JOB_DB survives restarts and keeps finished jobs for PPT_JOB_RETENTION_HOURS
+PPT_JOB_DB = os.environ.get("PPT_JOB_DB", job_manager.db_path)
+PPT_JOB_WORKERS = int(os.environ.get("PPT_JOB_WORKERS", str(job_manager.workers)))
+PPT_JOB_QUEUE_SIZE = int(os.environ.get("PPT_JOB_QUEUE_SIZE", str(job_manager.queue_size)))
+PPT_JOB_RETENTION_HOURS = float(os.environ.get("PPT_JOB_RETENTION_HOURS", str(job_manager.retention_hours)))
+job_manager.configure(PPT_JOB_DB, PPT_JOB_WORKERS, PPT_JOB_QUEUE_SIZE, PPT_JOB_RETENTION_HOURS)
+
 # # Create the directory if it doesn't exist
 # os.makedirs(PPT_FILES_PATH, exist_ok=True)
 
@@ -53,10 +155,198 @@ mcp = FastMCP(
             "description": "Path to Ppt files directory",
             "required": False,
             "default": PPT_FILES_PATH
+        },
+        "PPT_CACHE_SIZE": {
+            "description": "Maximum number of loaded presentations kept in memory (0 disables caching)",
+            "required": False,
+            "default": PPT_CACHE_SIZE
+        },
+        "PPT_WRITE_BACK": {
+            "description": "Defer saving edited presentations until they are flushed",
+            "required": False,
+            "default": PPT_WRITE_BACK
+        },
+        "PPT_FLUSH_DELAY": {
+            "description": "Seconds without edits after which a deferred presentation is saved",
+            "required": False,
+            "default": PPT_FLUSH_DELAY
+        },
+        "PPT_WORKER_THREADS": {
+            "description": "Number of worker threads running tool calls off the event loop",
+            "required": False,
+            "default": PPT_WORKER_THREADS
+        },
+        "PPT_LOCK_DIR": {
+            "description": "Directory for advisory lock files shared by server processes",
+            "required": False,
+            "default": PPT_LOCK_DIR
+        },
+        "PPT_RENDER_WORKERS": {
+            "description": "Number of worker processes for conversions and shape images (0 renders in the server process)",
+            "required": False,
+            "default": PPT_RENDER_WORKERS
+        },
+        "PPT_RENDER_MAX_TASKS": {
+            "description": "Number of jobs after which a rendering worker process is replaced (0 never replaces it)",
+            "required": False,
+            "default": PPT_RENDER_MAX_TASKS
+        },
+        "PPT_RESULT_CACHE_DIR": {
+            "description": "Directory of the conversion result cache",
+            "required": False,
+            "default": PPT_RESULT_CACHE_DIR
+        },
+        "PPT_RESULT_CACHE_MB": {
+            "description": "Disk budget of the conversion result cache in megabytes (0 disables it)",
+            "required": False,
+            "default": PPT_RESULT_CACHE_MB
+        },
+        "PPT_RESULT_CACHE_LINK": {
+            "description": "How cached conversion results are written to the output path: copy or hardlink",
+            "required": False,
+            "default": PPT_RESULT_CACHE_LINK
+        },
+        "PPT_COALESCE": {
+            "description": "Share one execution between identical concurrent read-only calls (convert_pptx, shape_to_image, get_shape_titles)",
+            "required": False,
+            "default": PPT_COALESCE
+        },
+        "PPT_HEAVY_CONCURRENCY": {
+            "description": "Concurrency budget of rendering tools (convert_pptx, shape_to_image, convert_directory)",
+            "required": False,
+            "default": PPT_HEAVY_CONCURRENCY
+        },
+        "PPT_HEAVY_QUEUE": {
+            "description": "Number of rendering tool calls that may wait for the budget before calls are rejected",
+            "required": False,
+            "default": PPT_HEAVY_QUEUE
+        },
+        "PPT_READ_CONCURRENCY": {
+            "description": "Concurrency budget of read-only tools",
+            "required": False,
+            "default": PPT_READ_CONCURRENCY
+        },
+        "PPT_READ_QUEUE": {
+            "description": "Number of read-only tool calls that may wait for the budget before calls are rejected",
+            "required": False,
+            "default": PPT_READ_QUEUE
+        },
+        "PPT_EDIT_CONCURRENCY": {
+            "description": "Concurrency budget of editing tools",
+            "required": False,
+            "default": PPT_EDIT_CONCURRENCY
+        },
+        "PPT_EDIT_QUEUE": {
+            "description": "Number of editing tool calls that may wait for the budget before calls are rejected",
+            "required": False,
+            "default": PPT_EDIT_QUEUE
+        },
+        "PPT_TOOL_TIMEOUT": {
+            "description": "Seconds after which a tool call is cancelled (0 means no limit)",
+            "required": False,
+            "default": PPT_TOOL_TIMEOUT
+        },
+        "PPT_TOOL_TIMEOUTS": {
+            "description": "Per-tool timeouts overriding PPT_TOOL_TIMEOUT, e.g. convert_pptx=600,shape_to_image=120",
+            "required": False,
+            "default": ",".join(f"{name}={seconds:g}" for name, seconds in PPT_TOOL_TIMEOUTS.items())
+        },
+        "PPT_RENDER_KILL_GRACE": {
+            "description": "Seconds a cancelled rendering job may keep running before its worker processes are replaced",
+            "required": False,
+            "default": PPT_RENDER_KILL_GRACE
+        },
+        "PPT_JOB_DB": {
+            "description": "SQLite file holding the background job table",
+            "required": False,
+            "default": PPT_JOB_DB
+        },
+        "PPT_JOB_WORKERS": {
+            "description": "Number of background conversion jobs running at a time",
+            "required": False,
+            "default": PPT_JOB_WORKERS
+        },
+        "PPT_JOB_QUEUE_SIZE": {
+            "description": "Maximum number of background jobs waiting to run",
+            "required": False,
+            "default": PPT_JOB_QUEUE_SIZE
+        },
+        "PPT_JOB_RETENTION_HOURS": {
+            "description": "Hours finished background jobs are kept in the job table (0 keeps them forever)",
+            "required": False,
+            "default": PPT_JOB_RETENTION_HOURS
         }
     }
 )
 
+def tool_timeout(name:str) -> float:
+    """Timeout in seconds of the tool called name; 0 means none."""
+    return PPT_TOOL_TIMEOUTS.get(name, PPT_TOOL_TIMEOUT)
+
+# Scheduling priority of the work of each tool class on the worker threads and processes
+CLASS_PRIORITIES = {"edit": "interactive", "read": "normal", "heavy": "normal"}
+
+def client_session() -> Optional[int]:
+    """Identity of the MCP client session of the current request, or None outside a request."""
+    try:
+        return id(mcp.get_context().session)
+    except (LookupError, ValueError):
+        return None
+
+class _Admitted:
+    """Units of a class's budget held by a tool call until it returns, unless handed over with take()."""
+    __slots__ = ("tool_class", "units")
+
+    def __init__(self, tool_class:str, units:int):
+        self.tool_class = tool_class
+        self.units = units
+
+    def take(self) -> int:
+        units, self.units = self.units, 0
+        return units
+
+_admitted:contextvars.ContextVar[Optional[_Admitted]] = contextvars.ContextVar("spire_ppt_admitted", default=None)
+
+def tool_policy(tool_class:str, weight=None, priority:str = None):
+    """
+    Admit calls of the decorated tool through the concurrency budget of tool_class,
+    schedule their work with priority (default: the class's), and cancel them
+    after the tool's timeout.
+
+    weight(kwargs) gives the units a call takes (default 1). A call rejected
+    because the class's wait queue is full returns a server busy error, a
+    call that runs out of time a timeout error. Time spent waiting for the
+    budget counts towards the timeout.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async def call():
+                try:
+                    units = await admission.acquire(tool_class, weight(kwargs) if weight else 1)
+                except ServerBusyError as e:
+                    logger.warning(f"Rejected {func.__name__}: {e}")
+                    return f"Error: {str(e)}"
+                admitted = _Admitted(tool_class, units)
+                token = _admitted.set(admitted)
+                try:
+                    with call_priority(priority or CLASS_PRIORITIES[tool_class], client_session()):
+                        return await func(*args, **kwargs)
+                finally:
+                    _admitted.reset(token)
+                    admission.release(tool_class, admitted.take())
+
+            timeout = tool_timeout(func.__name__)
+            if timeout <= 0:
+                return await call()
+            try:
+                return await asyncio.wait_for(call(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"{func.__name__} timed out after {timeout}s")
+                return f"Error: {func.__name__} timed out after {timeout} seconds"
+        return wrapper
+    return decorate
+
 def get_ppt_path(filename: str) -> str:
     """Get full path to Ppt file.
     
@@ -73,8 +363,405 @@ def get_ppt_path(filename: str) -> str:
     # Use the configured Ppt files path
     return os.path.join(PPT_FILES_PATH, filename)
 
+def _pinned_call(path:str, func, /, *args, **kwargs):
+    with presentation_cache.pinned(path):
+        return func(*args, **kwargs)
+
+def _checkpointed_call(path:str, func, /, *args, **kwargs):
+    with presentation_cache.checkpoint(path):
+        return func(*args, **kwargs)
+
+async def run_exclusive(path:str, func, /, *args, **kwargs):
+    """Run func on the tool executor with exclusive access to the file at path."""
+    async with file_locks.write(path):
+        # A cancelled call still finishes before the lock is released
+        return await tool_executor.run_to_completion(_pinned_call, path, func, *args, **kwargs)
+
+async def run_writer(path:str, func, /, *args, **kwargs):
+    """Run the edit func like run_exclusive(); if it fails, its partial changes are dropped from the cache."""
+    return await run_exclusive(path, _checkpointed_call, path, func, *args, **kwargs)
+
+async def run_reader(path:str, func, /, *args, **kwargs):
+    """Run func on the tool executor with access to path shared with other readers."""
+    async with file_locks.read(path):
+        # A cancelled read still finishes before the lock is released: a writer
+        # must not get the cached presentation while a thread is reading it
+        return await tool_executor.run_to_completion(_pinned_call, path, func, *args, **kwargs)
+
+@asynccontextmanager
+async def render_access(path:str):
+    """Shared access to path for a series of rendering jobs.
+
+    Deferred edits are written first: render workers, result cache keys and
+    slide fingerprints all read the file from disk. An edit can land between
+    the flush and taking the read lock, so the flush is repeated until the
+    file is clean while the read lock is held.
+    """
+    while True:
+        if presentation_cache.is_dirty(path):
+            await run_exclusive(path, presentation_cache.flush, path)
+        async with file_locks.read(path):
+            if presentation_cache.is_dirty(path):
+                continue
+            yield
+            return
+
+async def render_job(path:str, func, /, *args, **kwargs):
+    """Run a rendering job on the render worker pool, or on the tool executor if the pool is disabled.
+
+    The caller must hold render_access(path). A cancelled in-process job still
+    finishes first, so the caller's lock and cleanup of partial outputs outlive it.
+    """
+    if render_pool.enabled:
+        return await render_pool.run(func, *args, **kwargs)
+    return await tool_executor.run_to_completion(_pinned_call, path, func, *args, **kwargs)
+
+async def run_coalesced(tool:str, path:str, arguments:Dict[str,Any], func, /, *args, **kwargs):
+    """
+    Await func(*args, **kwargs) for a read-only call of tool on the file at path,
+    sharing one execution with identical calls in flight.
+
+    Files with deferred edits are not coalesced: their version on disk does
+    not tell edits apart. Only the first caller's progress is reported. The
+    execution takes over the first caller's admission units and releases them
+    when it finishes, so they stay held if that caller is cancelled first.
+    """
+    admitted = _admitted.get()
+
+    async def execute():
+        units = admitted.take() if admitted else 0
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            if units:
+                admission.release(admitted.tool_class, units)
+
+    key = None
+    if not presentation_cache.is_dirty(path):
+        key = singleflight.request_key(tool, path, arguments)
+    return await singleflight.do(key, execute)
+
+async def run_renderer(path:str, func, /, *args, **kwargs):
+    """Run a rendering job with shared access to path."""
+    async with render_access(path):
+        return await render_job(path, func, *args, **kwargs)
+
+async def report_progress(ctx:Optional[Context], progress:float, total:float = None, message:str = None) -> None:
+    """Send an MCP progress notification if the client asked for them."""
+    if ctx is None:
+        return
+    try:
+        await ctx.report_progress(progress, total, message)
+    except ValueError:
+        # Called outside of an MCP request
+        pass
+
+async def render_in_parallel(
+        indices:List[int],
+        render_one,
+        workers:int = None,
+        ctx:Optional[Context] = None,
+        done:int = 0,
+        total:int = None,
+        label:str = "Slide"
+) -> None:
+    """
+    Await render_one(index) for every index, at most workers at a time.
+
+    Every finished item is reported as a progress notification carrying its
+    output path, so clients can pick up early results before the rest is
+    done. Cancelling the call cancels the items that have not started yet.
+    """
+    # In-process rendering shares one loaded deck, so it renders one item at a time;
+    # presentation_cache.pinned() also serializes it against other calls on the file
+    parallel = render_pool.max_workers if render_pool.enabled else 1
+    limit = asyncio.Semaphore(max(1, min(workers or parallel, parallel)))
+
+    async def render(index:int):
+        async with limit:
+            return index, await render_one(index)
+
+    tasks = [asyncio.ensure_future(render(index)) for index in indices]
+    try:
+        for next_item in asyncio.as_completed(tasks):
+            index, output_file = await next_item
+            done += 1
+            await report_progress(ctx, done, total, f"{label} {index + 1}: {output_file}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def render_indexed(
+        path:str,
+        output_dir:str,
+        kind:str,
+        options:Optional[Dict[str,Any]],
+        output_files:List[str],
+        requested:List[int],
+        render_one,
+        slide_num:int = None,
+        workers:int = None,
+        ctx:Optional[Context] = None,
+        label:str = "Slide"
+) -> int:
+    """
+    Bring output_files[index] up to date for every requested index of the
+    slides, or of the shapes of slide_num, and return how many were rendered.
+
+    Items whose fingerprint matches the manifest of an earlier export to
+    output_dir keep their file and are not rendered again; the others are
+    rendered with render_in_parallel(). Afterwards files of items that are
+    neither requested nor up to date are removed, so the directory never
+    shows stale renders, and the manifest records what it now holds.
+    The caller must hold render_access(path).
+    """
+    count = len(output_files)
+    fingerprints = await tool_executor.run(read_fingerprints, path, slide_num)
+    if fingerprints is not None and len(fingerprints) != count:
+        fingerprints = None
+    up_to_date = [False] * count
+    if fingerprints is not None:
+        up_to_date = await tool_executor.run(reuse_outputs, output_dir, kind, options, fingerprints, output_files, requested)
+    pending = [index for index in requested if not up_to_date[index]]
+    conversion_cache.release([output_files[index] for index in pending])
+    done = len(requested) - len(pending)
+    if done:
+        await report_progress(ctx, done, len(requested), f"Reused {done} unchanged {label.lower()}s")
+
+    finished = set()
+
+    async def render_tracked(index:int) -> str:
+        output_file = await render_one(index)
+        finished.add(index)
+        return output_file
+
+    try:
+        await render_in_parallel(pending, render_tracked, workers, ctx, done, len(requested), label)
+    except BaseException:
+        # Cancelled, timed out or failed: drop what may be half written and
+        # record the items that did finish, so the next export reuses them
+        current = finished | {index for index in range(count) if up_to_date[index]}
+        for index in pending:
+            if index not in finished and os.path.exists(output_files[index]):
+                os.remove(output_files[index])
+        if fingerprints is not None:
+            recorded = [fingerprint if index in current else None for index, fingerprint in enumerate(fingerprints)]
+            save_manifest(output_dir, kind, options, recorded, output_files)
+        raise
+
+    if fingerprints is not None:
+        current = set(requested) | {index for index in range(count) if up_to_date[index]}
+        for index in range(count):
+            if index not in current and os.path.exists(output_files[index]):
+                os.remove(output_files[index])
+        recorded = [fingerprint if index in current else None for index, fingerprint in enumerate(fingerprints)]
+        await tool_executor.run(save_manifest, output_dir, kind, options, recorded, output_files)
+    return len(pending)
+
+async def render_slide_files(
+        path:str,
+        format_type:str,
+        output_dir:str,
+        slide_count:int,
+        selected:List[int] = None,
+        options:Dict[str,Any] = None,
+        workers:int = None,
+        ctx:Optional[Context] = None
+) -> tuple[List[str],int]:
+    """
+    Render one image, SVG or thumbnail file per selected slide (default: all),
+    as one rendering job per slide, with render_indexed().
+    The caller must hold render_access(path).
+
+    Returns:
+    The output files of the selected slides and the number of slides rendered
+    """
+    output_files = [slide_output_path(output_dir, format_type, index, options) for index in range(slide_count)]
+    if selected is None:
+        selected = list(range(slide_count))
+
+    async def render_one(index:int) -> str:
+        files = await render_job(path, render_slides_impl, path, format_type, output_dir, index, index + 1, options)
+        return files[0]
+
+    rendered = await render_indexed(path, output_dir, format_type, options, output_files, selected, render_one,
+                                    workers=workers, ctx=ctx)
+    return [output_files[index] for index in selected], rendered
+
+async def cached_conversion(
+        path:str,
+        output_path:str,
+        format_type:str,
+        options:Dict[str,Any],
+        selected:Optional[List[int]]
+) -> tuple[Optional[str],Optional[dict]]:
+    """
+    Serve a conversion from the result cache.
+
+    Returns the cache key (None when the cache is disabled) and, on a hit,
+    the conversion result; on a miss the result is None and the caller
+    converts and passes the key to store_conversion().
+    The caller must hold render_access(path).
+    """
+    if not conversion_cache.enabled:
+        return None, None
+    single = format_type not in SLIDE_FORMATS
+    output_dir = os.path.dirname(output_path)
+    cache_options = options if selected is None else dict(options, slides=selected)
+    cache_key = await tool_executor.run(conversion_cache.key, path, format_type, cache_options)
+    output_files = await tool_executor.run(conversion_cache.fetch, cache_key, output_path)
+    if output_files is None:
+        return cache_key, None
+    if single:
+        result = conversion_result(path, output_path, format_type)
+    else:
+        # Record what the files now show, for the next incremental export
+        fingerprints = None
+        if selected is None:
+            fingerprints = await tool_executor.run(read_fingerprints, path)
+        if fingerprints is not None and len(fingerprints) == len(output_files):
+            await tool_executor.run(save_manifest, output_dir, format_type, options, fingerprints, output_files)
+        else:
+            await tool_executor.run(drop_manifest, output_dir, format_type)
+        result = conversion_result(path, output_path, format_type, output_files)
+        result["slides_rendered"] = 0
+    if selected is not None:
+        result["slides"] = selected
+    result["cache_hit"] = True
+    return cache_key, result
+
+async def store_conversion(cache_key:Optional[str], output_files:List[str], single:bool) -> None:
+    """Add the outputs of a conversion to the result cache; failing to do so is not an error."""
+    if cache_key is None:
+        return
+    try:
+        await tool_executor.run(conversion_cache.store, cache_key, output_files, single)
+    except OSError as e:
+        logger.warning(f"Failed to cache conversion result: {e}")
+
+async def convert_formats(
+        path:str,
+        output_path:str,
+        formats:List[str],
+        options:Dict[str,Any],
+        slide_count:int,
+        selected:Optional[List[int]],
+        workers:int = None,
+        ctx:Optional[Context] = None
+) -> dict[str,Any]:
+    """
+    Convert one presentation to several formats, each written to fan_out_path(output_path, format).
+
+    Formats found in the result cache are served from it. The single-file
+    formats left are converted by one rendering job that loads the deck
+    once and saves it in every format; per-slide formats are rendered with
+    render_slide_files() at the same time, on the other render workers.
+    A progress notification is sent for every finished format. A format
+    that fails gets an entry with an error; the others are still converted.
+    The caller must hold render_access(path).
+
+    Returns:
+    A message and one result entry per format, in the order of formats
+    """
+    results:Dict[str,dict] = {}
+    cache_keys:Dict[str,Optional[str]] = {}
+    done = 0
+
+    async def finish(format_type:str, result:dict) -> None:
+        nonlocal done
+        if selected is not None:
+            result["slides"] = selected
+        results[format_type] = result
+        done += 1
+        await report_progress(ctx, done, len(formats), f"{format_type.upper()}: {result['output_file']}")
+
+    def failure(format_type:str, error:Exception) -> dict:
+        return {
+            "error": str(error),
+            "source_file": path,
+            "output_file": fan_out_path(output_path, format_type),
+            "format": format_type
+        }
+
+    for format_type in formats:
+        format_options = options if format_type == 'thumbnail' else {}
+        cache_key, result = await cached_conversion(path, fan_out_path(output_path, format_type), format_type, format_options, selected)
+        cache_keys[format_type] = cache_key
+        if result is not None:
+            await finish(format_type, result)
+
+    file_formats = [format_type for format_type in formats if format_type not in results and format_type not in SLIDE_FORMATS]
+    slide_formats = [format_type for format_type in formats if format_type not in results and format_type in SLIDE_FORMATS]
+
+    async def convert_files() -> None:
+        paths = [fan_out_path(output_path, format_type) for format_type in file_formats]
+        conversion_cache.release(paths)
+        try:
+            converted = await render_job(
+                path,
+                convert_presentation_impl,
+                filepath=path,
+                output_filepath=output_path,
+                formats=file_formats,
+                slides=selected
+            )
+            entries = converted["results"]
+        except (ConversionError, RenderError) as e:
+            entries = [failure(format_type, e) for format_type in file_formats]
+        except BaseException:
+            # Don't leave truncated files behind
+            for output_file in paths:
+                if os.path.exists(output_file):
+                    os.remove(output_file)
+            raise
+        for result in entries:
+            if "error" not in result:
+                await store_conversion(cache_keys[result["format"]], [result["output_file"]], True)
+                result["cache_hit"] = False
+            await finish(result["format"], result)
+
+    async def convert_slides(format_type:str) -> None:
+        format_path = fan_out_path(output_path, format_type)
+        format_options = options if format_type == 'thumbnail' else {}
+        try:
+            output_files, rendered = await render_slide_files(
+                path, format_type, os.path.dirname(format_path), slide_count, selected, format_options, workers
+            )
+        except (ConversionError, RenderError) as e:
+            await finish(format_type, failure(format_type, e))
+            return
+        await store_conversion(cache_keys[format_type], output_files, False)
+        result = conversion_result(path, format_path, format_type, output_files)
+        result["slides_rendered"] = rendered
+        result["cache_hit"] = False
+        await finish(format_type, result)
+
+    # Coroutines are only created when they are awaited, so none is left unawaited if another job raises
+    jobs = ([convert_files] if file_formats else []) + [functools.partial(convert_slides, format_type) for format_type in slide_formats]
+    if render_pool.enabled:
+        outcomes = await asyncio.gather(*(job() for job in jobs), return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+    else:
+        # In-process rendering shares one loaded deck, so formats are converted one at a time
+        for job in jobs:
+            await job()
+
+    failed = [format_type for format_type in formats if "error" in results[format_type]]
+    message = f"Ppt file converted to {', '.join(format_type.upper() for format_type in formats)}"
+    if failed:
+        message = f"Failed to convert Ppt file to {', '.join(format_type.upper() for format_type in failed)}"
+    return {
+        "message": message,
+        "source_file": path,
+        "results": [results[format_type] for format_type in formats]
+    }
+
 @mcp.tool()
-def create_presentation(filepath:str) -> str:
+@tool_policy("edit")
+async def create_presentation(filepath:str) -> str:
     """
     Creates a new Ppt presentation.
     
@@ -86,7 +773,7 @@ def create_presentation(filepath:str) -> str:
     """
     try:
         full_path = get_ppt_path(filepath)
-        result = get_or_create_presentation(full_path)
+        result = await run_writer(full_path,get_or_create_presentation,full_path)
         return f"Created presentation at {full_path}"
     except PresentationError as e:
         return f"Error:{str(e)}"
@@ -95,7 +782,63 @@ def create_presentation(filepath:str) -> str:
         raise
 
 @mcp.tool()
-def create_slide(filepath:str) -> str:
+@tool_policy("edit")
+async def flush_presentation(filepath:str = None) -> dict[str,Any]:
+    """
+    Saves pending edits of a presentation to disk when the server runs in write-back mode.
+
+    Parameters:
+    filepath (str, optional): Path to the Ppt file. If omitted, all presentations with pending edits are saved.
+
+    Returns:
+    dict: Message and the list of files that were written
+    """
+    try:
+        if filepath is not None:
+            paths = [get_ppt_path(filepath)]
+        else:
+            paths = presentation_cache.dirty_paths()
+        flushed = []
+        for path in paths:
+            result = await run_exclusive(path,flush_presentation_impl,path)
+            flushed.extend(result["flushed"])
+        return {
+            "message": f"Flushed {len(flushed)} presentation(s)",
+            "flushed": flushed
+        }
+    except PresentationError as e:
+        return f"Error:{str(e)}"
+    except Exception as e:
+        logger.error(f"Error flushing presentation:{e}")
+        raise
+
+@mcp.tool()
+async def get_server_stats() -> dict[str,Any]:
+    """
+    Reports server load: event-loop lag, worker thread usage and presentation cache statistics.
+
+    Event-loop lag is how late a periodic timer on the server's event loop fires. It stays near zero
+    while tool calls run on worker threads; high values mean clients' SSE streams are stalling.
+
+    Returns:
+    dict: Statistics grouped by "event_loop", "executor", "cache", "locks", "render_pool", "result_cache",
+          "coalescing", "admission" and "jobs"
+    """
+    return {
+        "event_loop": loop_lag_monitor.stats(),
+        "executor": tool_executor.stats(),
+        "cache": presentation_cache.stats(),
+        "locks": file_locks.stats(),
+        "render_pool": render_pool.stats(),
+        "result_cache": conversion_cache.stats(),
+        "coalescing": singleflight.stats(),
+        "admission": admission.stats(),
+        "jobs": job_manager.stats()
+    }
+
+@mcp.tool()
+@tool_policy("edit")
+async def create_slide(filepath:str) -> str:
     """
     Creates a new slide in an existing presentaion.
     
@@ -107,7 +850,7 @@ def create_slide(filepath:str) -> str:
     """
     try:
         full_path = get_ppt_path(filepath)
-        result = create_slide_impl(full_path)
+        result = await run_writer(full_path,create_slide_impl,full_path)
         return str(result)
     except SlideError as e:
         return f"Error:{str(e)}"
@@ -116,7 +859,8 @@ def create_slide(filepath:str) -> str:
         raise
 
 @mcp.tool()
-def delete_slide(filepath:str,slide_num:int) -> dict[str,Any]:
+@tool_policy("edit")
+async def delete_slide(filepath:str,slide_num:int) -> dict[str,Any]:
     """
     Deletes a slide from an existing presentation.
 
@@ -130,7 +874,7 @@ def delete_slide(filepath:str,slide_num:int) -> dict[str,Any]:
     try:
         full_path = get_ppt_path(filepath)
         from .slide import delete_slide as delete_slide_impl
-        result = delete_slide_impl(full_path,slide_num)
+        result = await run_writer(full_path,delete_slide_impl,full_path,slide_num)
         return result
     except SlideError as e:
         return f"Error:{str(e)}"
@@ -139,7 +883,8 @@ def delete_slide(filepath:str,slide_num:int) -> dict[str,Any]:
         raise
 
 @mcp.tool()
-def add_shape(
+@tool_policy("edit")
+async def add_shape(
     filepath:str,
     slide_num:int = 0,
     x:float = 0,
@@ -187,7 +932,9 @@ def add_shape(
     """
     try:
         full_path = get_ppt_path(filepath)
-        result = add_shape_impl(
+        result = await run_writer(
+            full_path,
+            add_shape_impl,
             filepath=full_path,
             slide_num=slide_num,
             x = x,
@@ -206,7 +953,57 @@ def add_shape(
         raise
 
 @mcp.tool()
-def delete_shape(filepath:str,slide_num:int,shape_num:int) -> dict[str,Any]:
+@tool_policy("edit")
+async def add_shapes(
+    filepath:str,
+    shapes:List[Dict[str,Any]]
+) -> dict[str,Any]:
+    """
+    Adds many geometric shapes, on one or more slides, with a single load and save of the presentation.
+
+    Each shape is a dictionary with the arguments of add_shape (slide_num, x, y, width, height,
+    shape_type, line_color, fill_color), all optional with the same defaults, plus an optional text.
+    Shape types and colors are resolved once per distinct value.
+
+    Example:
+        [{"slide_num": 0, "x": 10, "y": 10, "width": 100, "height": 50, "shape_type": "Ellipse",
+          "fill_color": "#C0C0C0", "text": "Start"},
+         {"slide_num": 0, "x": 150, "y": 10, "width": 100, "height": 50, "line_color": "#FF5733"}]
+
+    Parameters:
+        filepath (str): Path to the PowerPoint file (.pptx).
+        shapes (List[Dict[str, Any]]): Specifications of the shapes to add, in order.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing operation result with the following keys:
+            - message (str): Description of the result.
+            - shapes (List[dict]): slide_num and shape_num (index on its slide) of each added shape, in order.
+
+    Raises:
+        ShapeError: If adding the shapes fails due to:
+                    - A malformed specification, an unknown key or an invalid hex color
+                    - Invalid slide number or file access issues
+                    Nothing is added when any shape fails.
+    """
+    try:
+        full_path = get_ppt_path(filepath)
+        from .shape import add_shapes as add_shapes_impl
+        result = await run_writer(
+            full_path,
+            add_shapes_impl,
+            filepath=full_path,
+            shapes=shapes
+        )
+        return result
+    except ShapeError as e:
+        return f"Error:{str(e)}"
+    except Exception as e:
+        logger.error(f"Error add shapes:{e}")
+        raise
+
+@mcp.tool()
+@tool_policy("edit")
+async def delete_shape(filepath:str,slide_num:int,shape_num:int) -> dict[str,Any]:
     """
     Deletes a shape from a specified slide in a PowerPoint presentation.
 
@@ -229,7 +1026,7 @@ def delete_shape(filepath:str,slide_num:int,shape_num:int) -> dict[str,Any]:
     try:
         full_path = get_ppt_path(filepath)
         from .shape import delete_shape as delete_shape_impl
-        result = delete_shape_impl(full_path,slide_num,shape_num)
+        result = await run_writer(full_path,delete_shape_impl,full_path,slide_num,shape_num)
         return result
     except ShapeError as e:
         return f"Error:{str(e)}"
@@ -238,7 +1035,8 @@ def delete_shape(filepath:str,slide_num:int,shape_num:int) -> dict[str,Any]:
         raise
 
 @mcp.tool()
-def add_text_shape(filepath:str,slide_num:int,shape_num:int = None,text:str = "") -> dict[str,Any]:
+@tool_policy("edit")
+async def add_text_shape(filepath:str,slide_num:int,shape_num:int = None,text:str = "") -> dict[str,Any]:
     """
     Adds a new text shape or updates an existing one on a specified slide in a PowerPoint presentation.
 
@@ -267,7 +1065,7 @@ def add_text_shape(filepath:str,slide_num:int,shape_num:int = None,text:str = ""
     try:
         full_path = get_ppt_path(filepath)
         from .shape import add_text_shape as add_text_shape_impl
-        result = add_text_shape_impl(full_path,slide_num,shape_num,text)
+        result = await run_writer(full_path,add_text_shape_impl,full_path,slide_num,shape_num,text)
         return result
     except ShapeError as e:
         return f"Error:{str(e)}"
@@ -276,18 +1074,28 @@ def add_text_shape(filepath:str,slide_num:int,shape_num:int = None,text:str = ""
         raise
 
 @mcp.tool()
-def add_chart(
+@tool_policy("edit")
+async def add_chart(
     filepath:str,
     slide_num:int,
     x:float = 0,
     y:float = 0,
     width:float = 200,
     height:float = 200,
-    chart_type:str = "Pie"
+    chart_type:str = "Pie",
+    categories:List[Any] = None,
+    series:Dict[str,List[float]] = None,
+    csv_path:str = None
 ) -> dict[str,Any]:
     """
     Adds a new chart to a specified location on a slide in a PowerPoint presentation.
 
+    Without data the chart keeps the library's sample data. Given `categories` and `series`, or a
+    CSV file, the data is written into the chart's embedded data sheet and the chart's categories
+    and series are bound to it, in the same load and save. A CSV file has the categories in its first
+    column, one series per further column and the series names in its first row. For Scatter chart
+    types the categories are the numeric X values.
+
     Parameters:
         filepath (str): Path to the PowerPoint file (.pptx).
         slide_num (int): Slide number where the chart will be added.
@@ -299,11 +1107,17 @@ def add_chart(
         chart_type (str, optional): Type of chart to add. Supported types depend on the underlying library.
                                     Common options include: 'Bar', 'Column', 'Pie', 'Line', 'Scatter', etc.
                                     Defaults to 'Pie'.
+        categories (List[Any], optional): Category labels, one per data point.
+        series (Dict[str, List[float]], optional): Values of each series by series name, one value per category.
+                                                   Empty values are left blank.
+        csv_path (str, optional): Path to a CSV file to read the chart data from instead of categories and series.
 
     Returns:
         Dict[str, Any]: A dictionary containing operation result with the following keys:
             - success (bool): Whether the operation was successful.
             - message (str): Detailed message or error description.
+            - categories (int, optional): Number of categories written, when data was given.
+            - series (int, optional): Number of series written, when data was given.
             - chart_info (dict, optional): Information about the added chart, such as:
                                            - chart_type (str)
                                            - position (x, y)
@@ -313,19 +1127,25 @@ def add_chart(
     Raises:
         ChartError: If adding the chart fails due to:
                     - Invalid parameters (e.g., invalid slide number or unsupported chart type)
+                    - Series lengths not matching the categories, or values that are not numbers
                     - File access issues
                     - Unsupported operations by the underlying library
     """
     try:
         full_path = get_ppt_path(filepath)
-        result = add_chart_impl(
+        result = await run_writer(
+            full_path,
+            add_chart_impl,
             filepath=full_path,
             slide_num=slide_num,
             x = x,
             y = y,
             width=width,
             height=height,
-            chart_type=chart_type
+            chart_type=chart_type,
+            categories=categories,
+            series=series,
+            csv_path=get_ppt_path(csv_path) if csv_path else None
         )
         return result
     except  ChartError as e:
@@ -335,18 +1155,29 @@ def add_chart(
         raise
 
 @mcp.tool()
-def create_smartart(
+@tool_policy("edit")
+async def create_smartart(
     filepath:str,
     slide_num:int,
     x:float = 0,
     y:float = 0,
     width:float = 200,
     height:float = 200,
-    layout_type:str = "Gear"
+    layout_type:str = "Gear",
+    outline:Any = None
 ) -> dict[str,Any]:
     """
     Adds a SmartArt graphic to a specified location on a slide in a PowerPoint presentation.
 
+    Without an outline the graphic keeps the layout's sample nodes. Given an outline, the sample
+    nodes are replaced by the outline's nodes and child nodes, built in one pass and saved once.
+    An outline is a list of nodes, where a node is a string, a {"text": ..., "children": [...]} dict,
+    or a string followed by a nested list of its children; or a dict mapping node texts to their children.
+
+    Example:
+        ["CEO", ["CTO", ["Development", "QA"], "CFO"]]
+        {"CEO": {"CTO": ["Development", "QA"], "CFO": null}}
+
     Parameters:
         filepath (str): Path to the PowerPoint file (.pptx).
         slide_num (int): Slide number where the SmartArt will be added.
@@ -358,11 +1189,14 @@ def create_smartart(
         layout_type (str, optional): Type of SmartArt layout to add. Supported types depend on the underlying library.
                                      Common examples include: 'Gear', 'Bubbles', 'List', 'Process', 'Hierarchy', etc.
                                      Defaults to 'Gear'.
+        outline (list or dict, optional): Nested outline of the nodes to create.
 
     Returns:
         Dict[str, Any]: A dictionary containing operation result with the following keys:
             - success (bool): Whether the operation was successful.
             - message (str): Detailed message or error description.
+            - nodes (int, optional): Number of nodes created, when an outline was given.
+            - depth (int, optional): Number of levels of the outline, when an outline was given.
             - smartart_info (dict, optional): Information about the added SmartArt graphic, such as:
                                               - layout_type (str)
                                               - position (x, y)
@@ -372,37 +1206,83 @@ def create_smartart(
     Raises:
         SmartArtError: If creating or inserting the SmartArt fails due to:
                        - Invalid parameters (e.g., invalid slide number or unsupported layout type)
+                       - A malformed outline (the outline depth is not checked against the layout)
                        - File access issues
                        - Unsupported operations by the underlying library
     """
     try:
         full_path = get_ppt_path(filepath)
-        result = create_smartart_impl(
+        result = await run_writer(
+            full_path,
+            create_smartart_impl,
             filepath=full_path,
             slide_num=slide_num,
             x = x,
             y = y,
             width=width,
             height=height,
-            layout_type=layout_type
+            layout_type=layout_type,
+            outline=outline
         )
         return result
     except  SmartArtError as e:
         return f"Error:{str(e)}"
     except Exception as e:
-        logger.error(f"Error add chart:{e}")
+        logger.error(f"Error add smartart:{e}")
         raise
 
+async def export_shapes(
+        full_path:str,
+        slide_num:int,
+        output_filepath:str,
+        shape_indices:List[int] = None,
+        workers:int = None,
+        ctx:Optional[Context] = None
+) -> dict[str,Any]:
+    """Export shapes as described for shape_to_image(), raising ShapeError or RenderError on failure."""
+    output_dir = shape_image_dir(output_filepath)
+    kind = "shapes"
+
+    async with render_access(full_path):
+        shape_count = await tool_executor.run_to_completion(_pinned_call, full_path, count_shapes_impl, full_path, slide_num)
+        if shape_indices is None:
+            shape_indices = list(range(shape_count))
+        for index in shape_indices:
+            if index < 0 or index >= shape_count:
+                raise ShapeError(f"length {index} greater than shape count")
+        output_files = [shape_output_path(output_dir, index) for index in range(shape_count)]
+
+        async def render_one(index:int) -> str:
+            result = await render_job(full_path, shape_to_image_impl, full_path, slide_num, output_filepath, [index])
+            return result["output_files"][0]
+
+        rendered = await render_indexed(full_path, output_dir, kind, None, output_files, sorted(set(shape_indices)),
+                                        render_one, slide_num=slide_num, workers=workers, ctx=ctx, label="Shape")
+
+    return {
+        "message": f"successfully",
+        "output_files": [output_files[index] for index in shape_indices],
+        "shapes_rendered": rendered
+    }
+
 @mcp.tool()
-def shape_to_image(
+@tool_policy("heavy")
+async def shape_to_image(
     filepath:str,
     slide_num:int,
-    output_filepath:str
+    output_filepath:str,
+    shape_indices:List[int] = None,
+    workers:int = None,
+    ctx:Context = None
 ) -> dict[str,Any]:
     """
-    Converts shapes on a specified slide of a PowerPoint presentation into an image file.
+    Converts shapes on a specified slide of a PowerPoint presentation into image files.
 
-    This function renders the slide content (including all shapes) into a static image and saves it to disk.
+    Every shape is saved as ShapeToImage-<index>.png in a directory named after output_filepath
+    without its extension. Shapes are rendered in parallel across render worker processes, and a
+    progress notification with the image path is sent for every finished shape. A manifest of
+    per-shape fingerprints is kept in that directory: shapes that did not change since the last
+    export to it are not rendered again.
 
     Parameters:
         filepath (str): Path to the input PowerPoint file (.pptx).
@@ -410,15 +1290,15 @@ def shape_to_image(
                          The index typically starts at 0 or 1 depending on the library or backend used.
         output_filepath (str): Full path where the output image will be saved (e.g., 'output/slide.png').
                                The file extension determines the image format (e.g., .png, .jpg).
+        shape_indices (List[int], optional): Indices of the shapes to export. Defaults to all shapes.
+        workers (int, optional): Number of worker processes rendering shapes in parallel.
+                                 Defaults to all render workers.
 
     Returns:
         Dict[str, Any]: A dictionary containing operation result with the following keys:
-            - success (bool): Whether the operation was successful.
             - message (str): Detailed message or error description.
-            - image_info (dict, optional): Additional information about the generated image, such as:
-                                           - file_path (str): Path to the saved image.
-                                           - dimensions (tuple): Width and height of the image.
-                                           - slide_number (int): Index of the exported slide.
+            - output_files (List[str]): Paths of the images of the requested shapes, in the order requested.
+            - shapes_rendered (int): Number of shapes that were rendered; the others were up to date.
 
     Raises:
         ShapeError: If exporting the slide as an image fails due to:
@@ -428,21 +1308,22 @@ def shape_to_image(
     """
     try:
         full_path = get_ppt_path(filepath)
-        from .shape import shape_to_image as shape_to_image_impl
-        result = shape_to_image_impl(
-            filepath=full_path,
-            slide_num=slide_num,
-            output_filepath = output_filepath
-        )
-        return result
-    except ShapeError as e:
+        arguments = {
+            "slide_num": slide_num,
+            "output_filepath": output_filepath,
+            "shape_indices": shape_indices,
+            "workers": workers
+        }
+        return await run_coalesced("shape_to_image", full_path, arguments, export_shapes, full_path, ctx=ctx, **arguments)
+    except (ShapeError, RenderError) as e:
         return f"Error:{str(e)}"
     except Exception as e:
         logger.error(f"Error:{e}")
         raise
     
 @mcp.tool()
-def create_table(
+@tool_policy("edit")
+async def create_table(
     filepath:str,
     slide_num:int,
     x:float = 0,
@@ -485,7 +1366,9 @@ def create_table(
     """
     try:
         full_path = get_ppt_path(filepath)
-        result = create_table_impl(
+        result = await run_writer(
+            full_path,
+            create_table_impl,
             filepath=full_path,
             slide_num=slide_num,
             x = x,
@@ -501,7 +1384,8 @@ def create_table(
         raise
     
 @mcp.tool()
-def add_text_table(
+@tool_policy("edit")
+async def add_text_table(
         filepath:str,
         slide_num:int,
         shape_num:int,
@@ -540,7 +1424,9 @@ def add_text_table(
     try:
         full_path = get_ppt_path(filepath)
         from .table import add_text_table as add_text_table_impl
-        result = add_text_table_impl(
+        result = await run_writer(
+            full_path,
+            add_text_table_impl,
             filepath=full_path,
             slide_num=slide_num,
             shape_num = shape_num,
@@ -554,7 +1440,157 @@ def add_text_table(
         raise
 
 @mcp.tool()
-def set_shape_fill_picture(
+@tool_policy("edit")
+async def fill_table(
+        filepath:str,
+        slide_num:int,
+        data:List[List[Any]] = None,
+        csv_path:str = None,
+        x:float = 0,
+        y:float = 0,
+        widths:List[float] = None,
+        row_height:float = 20,
+        chunk_rows:int = 1000
+) -> dict[str,Any]:
+    """
+    Creates a table sized to the given data on a slide and fills every cell in one pass.
+
+    The data is either a list of rows (each a list of cell values) or a CSV file. The table
+    gets one row per data row and as many columns as the longest row; shorter rows leave
+    their remaining cells empty. A CSV file is streamed in chunks of `chunk_rows` rows
+    rather than loaded whole. The presentation is loaded and saved once.
+
+    Parameters:
+        filepath (str): Path to the PowerPoint file (.pptx).
+        slide_num (int): Index of the slide where the table will be added.
+        data (List[List[Any]], optional): Rows of cell values. Values are written as text.
+        csv_path (str, optional): Path to a CSV file to read the rows from instead of `data`.
+        x (float, optional): X-coordinate of the table's top-left corner in pixels. Defaults to 0.
+        y (float, optional): Y-coordinate of the table's top-left corner in pixels. Defaults to 0.
+        widths (List[float], optional): Width of each column in pixels. Defaults to columns of
+                                        equal width filling the slide to the right of x.
+        row_height (float, optional): Height of each row in pixels. Defaults to 20.
+        chunk_rows (int, optional): Number of rows read and written per chunk. Defaults to 1000.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing the result of the operation:
+            - success (bool): True if the table was created and filled.
+            - message (str): Description of the result.
+            - rows (int): Number of rows in the table.
+            - columns (int): Number of columns in the table.
+            - cells (int): Number of cells filled from the data.
+            - elapsed_seconds (float): Time spent creating and filling the table.
+            - cells_per_second (float): Fill throughput.
+
+    Raises:
+        TableError: If the operation fails due to:
+                    - Neither or both of data and csv_path given, or empty data
+                    - widths not matching the number of columns
+                    - Invalid file path or slide number
+    """
+    try:
+        full_path = get_ppt_path(filepath)
+        from .table import fill_table as fill_table_impl
+        result = await run_writer(
+            full_path,
+            fill_table_impl,
+            filepath=full_path,
+            slide_num=slide_num,
+            data=data,
+            csv_path=get_ppt_path(csv_path) if csv_path else None,
+            x=x,
+            y=y,
+            widths=widths,
+            row_height=row_height,
+            chunk_rows=chunk_rows
+        )
+        return result
+    except TableError as e:
+        return f"Error:{str(e)}"
+    except Exception as e:
+        logger.error(f"Error:{e}")
+        raise
+
+@mcp.tool()
+@tool_policy("edit")
+async def create_paginated_table(
+        filepath:str,
+        slide_num:int,
+        data:List[List[Any]] = None,
+        csv_path:str = None,
+        x:float = 0,
+        y:float = 0,
+        widths:List[float] = None,
+        header:bool = True,
+        font_size:float = 12,
+        bottom_margin:float = None
+) -> dict[str,Any]:
+    """
+    Lays out a table of any length over as many slides as it needs, starting on a given slide.
+
+    The first page goes on `slide_num`; each following page goes on a new slide with the same layout,
+    inserted after the previous one. Row heights are estimated from the text length, column width and font size, and a
+    page takes rows until the next row would cross the bottom margin. A CSV file is read one page at a
+    time, so large datasets are never loaded into memory whole. The presentation is loaded and saved once.
+
+    Parameters:
+        filepath (str): Path to the PowerPoint file (.pptx).
+        slide_num (int): Index of the slide where the first page of the table will be added.
+        data (List[List[Any]], optional): Rows of cell values. Values are written as text.
+        csv_path (str, optional): Path to a CSV file to read the rows from instead of `data`.
+        x (float, optional): X-coordinate of the table's top-left corner on every page. Defaults to 0.
+        y (float, optional): Y-coordinate of the table's top-left corner on every page. Defaults to 0.
+        widths (List[float], optional): Width of each column. Defaults to columns of equal width
+                                        filling the slide to the right of x.
+        header (bool, optional): Treat the first row as a header and repeat it at the top of every page.
+                                 Defaults to True.
+        font_size (float, optional): Font size of the cell text, used by the row height estimate. Defaults to 12.
+        bottom_margin (float, optional): Space to leave below the table on every page. Defaults to y.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing the result of the operation:
+            - success (bool): True if the table was laid out.
+            - message (str): Description of the result.
+            - slides (List[int]): Indexes of the slides holding the pages of the table.
+            - rows (int): Number of data rows written, not counting repeated headers.
+            - columns (int): Number of columns, taken from the first row.
+            - cells (int): Number of cells filled, including repeated headers.
+            - elapsed_seconds (float): Time spent creating and filling the tables.
+            - cells_per_second (float): Fill throughput.
+
+    Raises:
+        TableError: If the operation fails due to:
+                    - Neither or both of data and csv_path given, or empty data
+                    - A row longer than the first row, or widths not matching the number of columns
+                    - Invalid file path or slide number
+    """
+    try:
+        full_path = get_ppt_path(filepath)
+        from .table import paginate_table as paginate_table_impl
+        result = await run_writer(
+            full_path,
+            paginate_table_impl,
+            filepath=full_path,
+            slide_num=slide_num,
+            data=data,
+            csv_path=get_ppt_path(csv_path) if csv_path else None,
+            x=x,
+            y=y,
+            widths=widths,
+            header=header,
+            font_size=font_size,
+            bottom_margin=bottom_margin
+        )
+        return result
+    except TableError as e:
+        return f"Error:{str(e)}"
+    except Exception as e:
+        logger.error(f"Error:{e}")
+        raise
+
+@mcp.tool()
+@tool_policy("edit")
+async def set_shape_fill_picture(
     filepath:str,
     slide_num:int,
     shape_num:int,
@@ -594,7 +1630,9 @@ def set_shape_fill_picture(
     try:
         full_path = get_ppt_path(filepath)
         from .shape import fill_shape_with_picture as fill_shape_with_picture_impl
-        result = fill_shape_with_picture_impl(
+        result = await run_writer(
+            full_path,
+            fill_shape_with_picture_impl,
             filepath=full_path,
             slide_num=slide_num,
             shape_num = shape_num,
@@ -608,7 +1646,8 @@ def set_shape_fill_picture(
         raise
     
 @mcp.tool()
-def get_shape_titles(
+@tool_policy("read")
+async def get_shape_titles(
         filepath:str,
         output_filepath:str
 ) -> dict[str,Any]:
@@ -644,7 +1683,13 @@ def get_shape_titles(
     try:
         full_path = get_ppt_path(filepath)
         from .shape import get_shape_titles as get_shape_titles_impl
-        result = get_shape_titles_impl(
+        result = await run_coalesced(
+            "get_shape_titles",
+            full_path,
+            {"output_filepath": output_filepath},
+            run_reader,
+            full_path,
+            get_shape_titles_impl,
             filepath=full_path,
             output_filepath=output_filepath
         )
@@ -656,7 +1701,8 @@ def get_shape_titles(
         raise
             
 @mcp.tool()
-def group_shapes(
+@tool_policy("edit")
+async def group_shapes(
         filepath:str,
         slide_num:int,
         shape_num_list:List[int] = []
@@ -692,7 +1738,9 @@ def group_shapes(
     try:
         full_path = get_ppt_path(filepath)
         from .shape import group_shapes as group_shapes_impl
-        result = group_shapes_impl(
+        result = await run_writer(
+            full_path,
+            group_shapes_impl,
             filepath=full_path,
             slide_num=slide_num,
             shape_num_list = shape_num_list
@@ -705,7 +1753,8 @@ def group_shapes(
         raise
 
 @mcp.tool()
-def ungroup_shapes(
+@tool_policy("edit")
+async def ungroup_shapes(
         filepath:str,
         slide_num:int,
         shape_num:int
@@ -742,7 +1791,9 @@ def ungroup_shapes(
     try:
         full_path = get_ppt_path(filepath)
         from .shape import ungroup_shapes as ungroup_shapes_impl
-        result = ungroup_shapes_impl(
+        result = await run_writer(
+            full_path,
+            ungroup_shapes_impl,
             filepath=full_path,
             slide_num=slide_num,
             shape_num = shape_num
@@ -755,7 +1806,8 @@ def ungroup_shapes(
         raise
     
 @mcp.tool()
-def change_slide_position(
+@tool_policy("edit")
+async def change_slide_position(
     filepath: str,
     slide_num:int,
     slide_number:int
@@ -789,7 +1841,9 @@ def change_slide_position(
     try:
         full_path = get_ppt_path(filepath)
         from .slide import change_slide_position as change_slide_position_impl
-        result = change_slide_position_impl(
+        result = await run_writer(
+            full_path,
+            change_slide_position_impl,
             filepath=full_path,
             slide_num=slide_num,
             slide_number = slide_number
@@ -802,7 +1856,8 @@ def change_slide_position(
         raise
     
 @mcp.tool()
-def add_image_in_master(
+@tool_policy("edit")
+async def add_image_in_master(
         filepath: str, 
         image_filepath: str,
         master_num:int = 0,
@@ -849,7 +1904,9 @@ def add_image_in_master(
     try:
         full_path = get_ppt_path(filepath)
         from .slide import add_image_in_master as add_image_in_master_impl
-        result = add_image_in_master_impl(
+        result = await run_writer(
+            full_path,
+            add_image_in_master_impl,
             filepath=full_path,
             image_filepath=image_filepath,
             master_num = master_num,
@@ -866,7 +1923,8 @@ def add_image_in_master(
         raise
 
 @mcp.tool()
-def set_alignment(
+@tool_policy("edit")
+async def set_alignment(
         filepath:str,
         slide_num:int = 0,
         shape_num:int = 0,
@@ -907,7 +1965,9 @@ def set_alignment(
     try:
         full_path = get_ppt_path(filepath)
         from .shape import set_alignment as set_alignment_impl
-        result = set_alignment_impl(
+        result = await run_writer(
+            full_path,
+            set_alignment_impl,
             filepath=full_path,
             slide_num=slide_num,
             shape_num = shape_num,
@@ -922,7 +1982,8 @@ def set_alignment(
         raise
 
 @mcp.tool()
-def append_html(
+@tool_policy("edit")
+async def append_html(
         filepath:str,
         slide_num:int = 0,
         shape_num:int = 0,
@@ -964,7 +2025,9 @@ def append_html(
     try:
         full_path = get_ppt_path(filepath)
         from .shape import append_html as append_html_impl
-        result = append_html_impl(
+        result = await run_writer(
+            full_path,
+            append_html_impl,
             filepath=full_path,
             slide_num=slide_num,
             shape_num = shape_num,
@@ -978,7 +2041,8 @@ def append_html(
         raise
 
 @mcp.tool()
-def set_autofittext(
+@tool_policy("edit")
+async def set_autofittext(
         filepath:str,
         slide_num:int = 0,
         shape_num:int = 0,
@@ -1020,7 +2084,9 @@ def set_autofittext(
     try:
         full_path = get_ppt_path(filepath)
         from .shape import set_autofittext as set_autofittext_impl
-        result = set_autofittext_impl(
+        result = await run_writer(
+            full_path,
+            set_autofittext_impl,
             filepath=full_path,
             slide_num=slide_num,
             shape_num = shape_num,
@@ -1034,7 +2100,8 @@ def set_autofittext(
         raise
 
 @mcp.tool()
-def set_verticaltext(
+@tool_policy("edit")
+async def set_verticaltext(
         filepath:str,
         slide_num:int = 0,
         shape_num:int = 0,
@@ -1075,7 +2142,9 @@ def set_verticaltext(
     try:
         full_path = get_ppt_path(filepath)
         from .shape import set_verticaltext as set_verticaltext_impl
-        result = set_verticaltext_impl(
+        result = await run_writer(
+            full_path,
+            set_verticaltext_impl,
             filepath=full_path,
             slide_num=slide_num,
             shape_num = shape_num,
@@ -1089,7 +2158,8 @@ def set_verticaltext(
         raise
 
 @mcp.tool()
-def set_text_color(
+@tool_policy("edit")
+async def set_text_color(
         filepath:str,
         slide_num:int = 0,
         shape_num:int = 0,
@@ -1116,7 +2186,9 @@ def set_text_color(
     try:
         full_path = get_ppt_path(filepath)
         from .shape import set_text_color as set_text_color_impl
-        result = set_text_color_impl(
+        result = await run_writer(
+            full_path,
+            set_text_color_impl,
             filepath=full_path,
             slide_num=slide_num,
             shape_num = shape_num,
@@ -1129,50 +2201,475 @@ def set_text_color(
         logger.error(f"Error:{e}")
         raise
 
+@mcp.tool()
+@tool_policy("edit", priority="normal")
+async def batch_operations(
+        filepath:str,
+        operations:List[Dict[str,Any]]
+) -> dict[str,Any]:
+    """
+    Applies an ordered list of editing operations to a presentation with a single load and a single save.
+
+    Each operation is a dictionary whose "op" key names the operation and whose other keys are the
+    arguments of the tool with the same name, without `filepath`. Supported operations:
+    create_slide, delete_slide, change_slide_position, add_image_in_master, add_shape, add_shapes, delete_shape,
+    add_text_shape, set_shape_fill_picture, group_shapes, ungroup_shapes, set_alignment, append_html,
+    set_autofittext, set_verticaltext, set_text_color, add_chart, create_smartart, create_table, add_text_table,
+    fill_table, create_paginated_table.
+
+    Example:
+        [{"op": "create_slide"},
+         {"op": "add_shape", "slide_num": 1, "shape_type": "Ellipse", "fill_color": "#C0C0C0"},
+         {"op": "add_text_shape", "slide_num": 1, "shape_num": 0, "text": "Hello"}]
+
+    The batch is applied as a transaction: if an operation fails, none of the batch's changes are saved.
+
+    Parameters:
+        filepath (str): Path to the PowerPoint file (.pptx).
+        operations (List[Dict[str, Any]]): Operations to apply, in order.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing the result of the batch:
+            - success (bool): True if every operation succeeded and the presentation was saved.
+            - message (str): Description of the result or error.
+            - results (List[dict]): Per-operation results with index, op, success and result or error.
+
+    Raises:
+        BatchError: If the operation list is malformed or the presentation cannot be saved.
+    """
+    try:
+        full_path = get_ppt_path(filepath)
+        from .batch import apply_operations as apply_operations_impl
+        result = await run_writer(
+            full_path,
+            apply_operations_impl,
+            filepath=full_path,
+            operations=operations
+        )
+        return result
+    except BatchError as e:
+        return f"Error:{str(e)}"
+    except Exception as e:
+        logger.error(f"Error:{e}")
+        raise
+
+async def run_conversion(
+        filepath:str,
+        output_filepath:str,
+        format_type:str = None,
+        formats:List[str] = None,
+        slides:List[int] = None,
+        slide_range:str = None,
+        workers:int = None,
+        width:int = None,
+        scale:float = None,
+        image_format:str = None,
+        quality:int = None,
+        ctx:Optional[Context] = None
+) -> dict[str,Any]:
+    """
+    Convert a presentation as described for convert_pptx(), raising ConversionError or RenderError on failure.
+
+    Shared by convert_pptx() and conversion jobs; ctx is anything with an
+    async report_progress(progress, total, message).
+    """
+    full_path = get_ppt_path(filepath)
+    output_path = get_ppt_path(output_filepath)
+    if formats is not None:
+        formats = fan_out_formats(formats)
+    elif format_type is None:
+        raise ConversionError("Either format_type or formats must be given")
+    else:
+        format_type = format_type.lower()
+
+    options = {}
+    if format_type == 'thumbnail' or (formats is not None and 'thumbnail' in formats):
+        options = thumbnail_options(width, scale, image_format, quality)
+    if not os.path.exists(full_path):
+        raise ConversionError(f"File not found: {full_path}")
+
+    async with render_access(full_path):
+        # Only per-slide formats and selections need the slide count; whole-deck
+        # pdf/html exports leave loading the deck to the render worker
+        slide_count = None
+        selected = None
+        requested = formats if formats is not None else [format_type]
+        if slides is not None or slide_range or any(requested_format in SLIDE_FORMATS for requested_format in requested):
+            slide_count = await tool_executor.run_to_completion(_pinned_call, full_path, count_slides_impl, full_path)
+            selected = select_slides(slide_count, slides, slide_range)
+        if formats is not None:
+            return await convert_formats(full_path, output_path, formats, options, slide_count, selected, workers, ctx)
+
+        single = format_type not in SLIDE_FORMATS
+        output_dir = os.path.dirname(output_path)
+        cache_key, result = await cached_conversion(full_path, output_path, format_type, options, selected)
+        if result is not None:
+            await report_progress(ctx, 1, 1, f"Cached result: {output_path}")
+            return result
+
+        if single:
+            await report_progress(ctx, 0, 1, f"Converting to {format_type.upper()}")
+            conversion_cache.release([output_path])
+            try:
+                result = await render_job(
+                    full_path,
+                    convert_presentation_impl,
+                    filepath=full_path,
+                    output_filepath=output_path,
+                    format_type=format_type,
+                    slides=selected
+                )
+            except BaseException:
+                # Don't leave a truncated file behind
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise
+            output_files = [output_path]
+            await report_progress(ctx, 1, 1, output_path)
+        else:
+            output_files, rendered = await render_slide_files(
+                full_path, format_type, output_dir, slide_count, selected, options, workers, ctx
+            )
+            result = conversion_result(full_path, output_path, format_type, output_files)
+            result["slides_rendered"] = rendered
+        if selected is not None:
+            result["slides"] = selected
+
+        await store_conversion(cache_key, output_files, single)
+        result["cache_hit"] = False
+        return result
 
 @mcp.tool()
-def convert_pptx(
+@tool_policy("heavy")
+async def convert_pptx(
         filepath: str,
         output_filepath: str,
-        format_type: str,  
-) -> str:
+        format_type: str = None,
+        formats: List[str] = None,
+        slides: List[int] = None,
+        slide_range: str = None,
+        workers: int = None,
+        width: int = None,
+        scale: float = None,
+        image_format: str = None,
+        quality: int = None,
+        ctx: Context = None
+) -> dict[str,Any]:
     """
     Converts Ppt file to different formats.
 
     Supported formats:
     - pdf: Convert to PDF document
     - html: Convert to HTML document
-    - image: Convert to image file png
+    - image: Convert every slide to a png file
+    - svg: Convert every slide to an svg file
+    - thumbnail: Convert every slide to a small jpeg, webp or png preview, rendered directly at the
+                 target size (Thumbnail_<n>.jpg / .webp / .png)
+
+    For image, svg and thumbnail, one file per slide is written
+    to the directory of output_filepath, and the slides are split across render worker processes.
+    A progress notification is sent for every finished slide, with the slide's output file in its
+    message; other formats report start and completion.
+
+    Results are cached by the content of the source file, the format and the options: converting an
+    unchanged deck again copies the earlier output instead of rendering it, and cache_hit in the
+    result says whether that happened. Per-slide exports also keep a manifest of per-slide
+    fingerprints in the output directory; exporting to the same directory again only renders the
+    slides that changed, and slides_rendered in the result says how many that were.
+
+    Pass formats instead of format_type to convert to several formats at once: the deck is loaded
+    once for all single-file formats, and per-slide formats render on the other workers at the same
+    time. Single-file formats are written to output_filepath with the format's extension, per-slide
+    formats to its directory; a progress notification is sent for every finished format.
 
     Parameters:
         filepath (str): Path to the Excel file
-        format_type (str): Target format type (pdf, html, image)
+        format_type (str): Target format type (pdf, html, image, svg, thumbnail)
         output_filepath (str): Path for the output file
+        formats (List[str], optional): Target formats to convert to in one call, e.g. ["pdf", "thumbnail", "html"];
+                                       replaces format_type
+        slides (List[int], optional): 0-based indices of the slides to convert. Defaults to all slides.
+        slide_range (str, optional): Slides to convert as 0-based indices and inclusive ranges, e.g. "0-4,7";
+                                     combined with slides. Unselected slides are never rendered.
+        workers (int, optional): Number of worker processes rendering slides in parallel for
+                                 image, svg and thumbnail. Defaults to all render workers.
+        width (int, optional): Thumbnail width in pixels; the height follows the slide's aspect ratio.
+                               Defaults to 320.
+        scale (float, optional): Thumbnail size relative to the full image export, e.g. 0.25. Overrides width.
+        image_format (str, optional): Thumbnail encoding: jpeg (default), webp or png. jpeg and webp need Pillow.
+        quality (int, optional): jpeg/webp thumbnail quality from 1 to 100. Defaults to 75.
 
     Returns:
-        str: Success message or error description
+        dict: Conversion result with cache_hit and, for a subset, the selected slides; for image, svg and thumbnail,
+              output_files lists the written files in slide order and slides_rendered the number of slides rendered.
+              With formats, results holds one such result per format, or one with an error for a format that failed
     """
     try:
-        full_path = get_ppt_path(filepath)
-        output_path = get_ppt_path(output_filepath)
-        
-        result = convert_presentation_impl(
-            filepath=full_path,
-            output_filepath=output_path,
-            format_type=format_type
+        arguments = {
+            "output_filepath": output_filepath,
+            "format_type": format_type,
+            "formats": formats,
+            "slides": slides,
+            "slide_range": slide_range,
+            "workers": workers,
+            "width": width,
+            "scale": scale,
+            "image_format": image_format,
+            "quality": quality
+        }
+        return await run_coalesced(
+            "convert_pptx",
+            get_ppt_path(filepath),
+            arguments,
+            run_conversion,
+            filepath,
+            ctx=ctx,
+            **arguments
         )
-        
-        return result
-    except ConversionError as e:
+    except (ConversionError, RenderError) as e:
         return f"Error: {str(e)}"
     except Exception as e:
         logger.error(f"Error converting file: {e}")
         raise ConversionError(f"Failed to convert Ppt file: {str(e)}")
     
+@mcp.tool()
+@tool_policy("heavy", priority="bulk")
+async def convert_directory(
+        source: str,
+        format_type: str,
+        output_dir: str = None,
+        recursive: bool = False,
+        force: bool = False,
+        workers: int = None,
+        ctx: Context = None
+) -> dict[str,Any]:
+    """
+    Converts every presentation in a directory, or matching a glob pattern, to one format.
+
+    Decks are converted by several render workers at a time, each like a convert_pptx call, and a
+    progress notification is sent for every finished deck. Decks whose output is newer than the deck
+    are skipped. A deck that fails is listed with its error and the batch goes on.
+
+    Outputs mirror the layout of the source directory under output_dir: single-file formats are
+    written as <name>.<format>, per-slide formats (image, svg, thumbnail) to a folder <name>/.
+
+    Parameters:
+        source (str): Directory, or glob pattern such as "decks/**/*.pptx", relative to PPT_FILES_PATH
+                      unless absolute. Directories pick up .pptx, .pptm, .ppt, .ppsx, .pps and .odp files.
+        format_type (str): Target format type (pdf, html, ofd, xps, image, svg, thumbnail)
+        output_dir (str, optional): Directory for the outputs. Defaults to next to the decks.
+        recursive (bool, optional): Also convert decks in subdirectories of a directory source. Defaults to False.
+        force (bool, optional): Convert decks whose output is up to date as well. Defaults to False.
+        workers (int, optional): Number of decks converted at a time. Defaults to all render workers.
+
+    Returns:
+        dict: Counts of converted, skipped and failed decks, elapsed_seconds, files_per_second and
+              mb_per_second (of converted source files), the output files, and failures with their errors
+    """
+    try:
+        format_type = fan_out_formats([format_type])[0]
+        root, files = find_presentations(get_ppt_path(source), recursive)
+        output_root = get_ppt_path(output_dir) if output_dir else root
+        started = time.monotonic()
+        converted, skipped, failures = [], [], []
+        converted_bytes = 0
+        own_unit_free = True
+
+        @asynccontextmanager
+        async def deck_unit():
+            # Each deck converting at a time takes a heavy unit, so other calls interleave with the batch.
+            # The unit this call was admitted with is reused rather than waited on, so the batch always progresses.
+            nonlocal own_unit_free
+            if own_unit_free:
+                own_unit_free = False
+                try:
+                    yield
+                finally:
+                    own_unit_free = True
+                return
+            units = await admission.acquire("heavy", bounded=False)
+            try:
+                yield
+            finally:
+                admission.release("heavy", units)
+
+        async def convert_one(index:int) -> str:
+            nonlocal converted_bytes
+            path = files[index]
+            output_path = batch_output_path(path, root, output_root, format_type)
+            if not force and output_is_current(path, output_path, format_type):
+                skipped.append(path)
+                return f"{path} is up to date"
+            try:
+                async with deck_unit():
+                    result = await run_conversion(path, output_path, format_type, workers=1)
+            except Exception as e:
+                logger.error(f"Failed to convert {path}: {e}")
+                failures.append({"file": path, "error": str(e)})
+                return f"{path} failed: {e}"
+            converted.append(result["output_file"])
+            converted_bytes += os.path.getsize(path)
+            return result["output_file"]
+
+        await render_in_parallel(list(range(len(files))), convert_one, workers, ctx, total=len(files), label="Deck")
+        elapsed = time.monotonic() - started
+        return {
+            "message": f"Converted {len(converted)} of {len(files)} presentation(s) to {format_type.upper()}, "
+                       f"{len(skipped)} up to date, {len(failures)} failed",
+            "source": root,
+            "output_dir": output_root,
+            "format": format_type,
+            "converted": len(converted),
+            "skipped": len(skipped),
+            "failed": len(failures),
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(len(converted) / elapsed, 3) if elapsed > 0 else 0.0,
+            "mb_per_second": round(converted_bytes / 1024 / 1024 / elapsed, 3) if elapsed > 0 else 0.0,
+            "output_files": converted,
+            "failures": failures
+        }
+    except ConversionError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        logger.error(f"Error converting directory: {e}")
+        raise
+
+@mcp.tool()
+async def submit_conversion(
+        filepath: str,
+        output_filepath: str,
+        format_type: str = None,
+        formats: List[str] = None,
+        slides: List[int] = None,
+        slide_range: str = None,
+        workers: int = None,
+        width: int = None,
+        scale: float = None,
+        image_format: str = None,
+        quality: int = None
+) -> dict[str,Any]:
+    """
+    Queues a conversion to run in the background and returns at once with a job id.
+
+    Takes the same parameters as convert_pptx. Poll the job with get_job_status, fetch what
+    convert_pptx would have returned with get_job_result, or stop it with cancel_job. Jobs are
+    kept in a local SQLite file, so they survive a server restart: unfinished jobs run again.
+
+    Returns:
+        dict: Job status with job_id, status ("queued") and position in the queue
+    """
+    try:
+        if formats is not None:
+            formats = fan_out_formats(formats)
+        elif format_type is None:
+            raise ConversionError("Either format_type or formats must be given")
+        if format_type == 'thumbnail' or (formats is not None and 'thumbnail' in formats):
+            thumbnail_options(width, scale, image_format, quality)
+        full_path = get_ppt_path(filepath)
+        if not os.path.exists(full_path):
+            raise ConversionError(f"File not found: {full_path}")
+        return job_manager.submit("conversion", {
+            "filepath": os.path.abspath(full_path),
+            "output_filepath": os.path.abspath(get_ppt_path(output_filepath)),
+            "format_type": format_type,
+            "formats": formats,
+            "slides": slides,
+            "slide_range": slide_range,
+            "workers": workers,
+            "width": width,
+            "scale": scale,
+            "image_format": image_format,
+            "quality": quality
+        })
+    except (ConversionError, JobError) as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        logger.error(f"Error submitting conversion: {e}")
+        raise
+
+@mcp.tool()
+async def get_job_status(job_id:str) -> dict[str,Any]:
+    """
+    Reports the state of a background job.
+
+    Parameters:
+        job_id (str): Id returned by submit_conversion
+
+    Returns:
+        dict: job_id, status (queued, running, succeeded, failed or cancelled), timestamps, the queue position
+              of a queued job, the latest progress of a running job and the error of a failed job
+    """
+    try:
+        return job_manager.status(job_id)
+    except JobError as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+async def get_job_result(job_id:str) -> dict[str,Any]:
+    """
+    Returns the result of a background job.
+
+    Parameters:
+        job_id (str): Id returned by submit_conversion
+
+    Returns:
+        dict: The job status; once the job has succeeded, result holds what convert_pptx would have returned
+    """
+    try:
+        return job_manager.result(job_id)
+    except JobError as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+async def cancel_job(job_id:str) -> dict[str,Any]:
+    """
+    Cancels a queued or running background job. Slides that have not started rendering are skipped;
+    finished jobs are not changed.
+
+    Parameters:
+        job_id (str): Id returned by submit_conversion
+
+    Returns:
+        dict: The job status after cancelling
+    """
+    try:
+        return job_manager.cancel(job_id)
+    except JobError as e:
+        return f"Error: {str(e)}"
+
+async def run_conversion_job(**kwargs) -> dict[str,Any]:
+    """
+    Run a background conversion within the rendering budget, at bulk priority;
+    jobs are already bounded by their own queue.
+    """
+    units = await admission.acquire("heavy", bounded=False)
+    try:
+        with call_priority("bulk", "jobs"):
+            return await run_conversion(**kwargs)
+    finally:
+        admission.release("heavy", units)
+
+async def _flush_idle_presentations():
+    """Save deferred presentations once they have been idle for PPT_FLUSH_DELAY seconds."""
+    while True:
+        await asyncio.sleep(max(0.1, min(PPT_FLUSH_DELAY, 1.0)))
+        for path in presentation_cache.idle_paths(PPT_FLUSH_DELAY):
+            try:
+                await run_exclusive(path, presentation_cache.flush, path)
+            except Exception as e:
+                logger.error(f"Failed to flush presentation {path}: {e}")
+
 async def run_server():
     """Run the Spire.Ppt MCP Server."""
+    flusher = None
+    monitor = None
     try:
         logger.info(f"Starting Spire.Ppt MCP Server (files directory: {PPT_FILES_PATH})")
+        monitor = asyncio.create_task(loop_lag_monitor.run())
+        job_manager.register("conversion", run_conversion_job)
+        await job_manager.start()
+        if presentation_cache.write_back:
+            flusher = asyncio.create_task(_flush_idle_presentations())
         await mcp.run_sse_async()
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
@@ -1181,4 +2678,13 @@ async def run_server():
         logger.error(f"Server failed: {e}")
         raise
     finally:
+        for task in (flusher, monitor):
+            if task is not None:
+                task.cancel()
+        await job_manager.stop()
+        tool_executor.shutdown()
+        render_pool.shutdown()
+        flushed = presentation_cache.flush_all()
+        if flushed:
+            logger.info(f"Saved {len(flushed)} presentation(s) with pending edits")
         logger.info("Server shutdown complete")
@@ -1,18 +1,20 @@
 import logging
 import os
-from typing import Any
+from functools import lru_cache
+from typing import Any,Dict,List
 
 from spire.presentation import *
 
-from .exceptions import ShapeError
+from .cache import presentation_cache
+from .cancellation import check_cancelled
+from .exceptions import OperationCancelledError, ShapeError
 
 logger = logging.getLogger(__name__)
 
 def add_line_to_slide(filepath:str) -> dict:
     try:
         #Create a PPT document
-        presentation = Presentation()
-        presentation.LoadFromFile(filepath)
+        presentation = presentation_cache.get(filepath)
         #Get the first slide
         slide = presentation.Slides[0]
         #Add a line in the slide
@@ -20,13 +22,14 @@ def add_line_to_slide(filepath:str) -> dict:
         #Set color of the line
         line.ShapeStyle.LineColor.Color = Color.get_Red()
         #Save the document
-        presentation.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(presentation,filepath)
         return {"message": f"add successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"add failed: {e}")
         raise ShapeError(str(e))
     
@@ -44,8 +47,7 @@ def add_shape(
     try:
         
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
         
         slide = ppt.Slides[slide_num]
         
@@ -83,21 +85,21 @@ def add_shape(
                 shape.Line.SolidFillColor.Color = Color.FromRgb(r, g, b)
         
         #Save the document
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"add successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"add failed: {e}")
         raise ShapeError(str(e))
 
 def delete_shape(filepath:str,slide_num:int,shape_num:int) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
             
         slide = ppt.Slides[slide_num]
 
@@ -106,21 +108,139 @@ def delete_shape(filepath:str,slide_num:int,shape_num:int) -> dict[str,Any]:
         
         slide.Shapes.RemoveAt(shape_num)
 
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"delete successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"delete failed: {e}")
         raise ShapeError(str(e))
     
+SHAPE_SPEC_KEYS = {"slide_num", "x", "y", "width", "height", "shape_type", "line_color", "fill_color", "text"}
+
+@lru_cache(maxsize=None)
+def shape_type_by_name(name:str) -> ShapeType:
+    """The ShapeType called name, or Rectangle like add_shape."""
+    for type in ShapeType:
+        if type.name == name:
+            return type
+    return ShapeType.Rectangle
+
+def parse_color(value:str) -> Color:
+    """A Color from a hex string such as '#C0C0C0'."""
+    digits = value[1:] if value.startswith('#') else value
+    try:
+        if len(digits) != 6:
+            raise ValueError(digits)
+        return Color.FromRgb(int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16))
+    except ValueError:
+        raise ShapeError(f"Invalid color {value!r}, expected a hex color such as '#C0C0C0'")
+
+def add_shapes(
+        filepath:str,
+        shapes:List[Dict[str,Any]]
+) -> dict[str,Any]:
+    """
+    Add many shapes with one load and one save.
+
+    Each spec takes the arguments of add_shape plus an optional text. Shape
+    types and colours are resolved once per distinct value, and each target
+    slide and its shape collection are looked up once. Every spec is checked,
+    colours and slide numbers included, before the first shape is added, so
+    an invalid spec adds nothing.
+    """
+    if not isinstance(shapes, list):
+        raise ShapeError("shapes must be a list")
+    colors:Dict[str,Color] = {}
+    for index, spec in enumerate(shapes):
+        if not isinstance(spec, dict):
+            raise ShapeError(f"shape {index}: expected a dict, got {spec!r}")
+        unknown = set(spec) - SHAPE_SPEC_KEYS
+        if unknown:
+            raise ShapeError(f"shape {index}: unknown key(s) {', '.join(sorted(unknown))}")
+        slide_num = spec.get("slide_num", 0)
+        if not isinstance(slide_num, int) or isinstance(slide_num, bool):
+            raise ShapeError(f"shape {index}: slide_num must be an integer, got {slide_num!r}")
+        for key in ("x", "y", "width", "height"):
+            value = spec.get(key, 0)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise ShapeError(f"shape {index}: {key} must be a number, got {value!r}")
+        if not isinstance(spec.get("text", ""), str):
+            raise ShapeError(f"shape {index}: text must be a string")
+        for key in ("fill_color", "line_color"):
+            color = spec.get(key)
+            if color is not None and color not in colors:
+                if not isinstance(color, str):
+                    raise ShapeError(f"shape {index}: {key} must be a hex color string, got {color!r}")
+                try:
+                    colors[color] = parse_color(color)
+                except ShapeError as e:
+                    raise ShapeError(f"shape {index}: {e}")
+
+    index = None
+    try:
+        #Create a PPT document
+        ppt = presentation_cache.get(filepath)
+
+        slide_count = ppt.Slides.Count
+        for index, spec in enumerate(shapes):
+            slide_num = spec.get("slide_num", 0)
+            if not 0 <= slide_num < slide_count:
+                raise ShapeError(f"slide_num {slide_num} is out of range, the presentation has {slide_count} slide(s)")
+
+        slides:Dict[int,list] = {}
+        created = []
+        for index, spec in enumerate(shapes):
+            check_cancelled()
+            slide_num = spec.get("slide_num", 0)
+            if slide_num not in slides:
+                collection = ppt.Slides[slide_num].Shapes
+                slides[slide_num] = [collection, collection.Count]
+            target = slides[slide_num]
+
+            x, y = spec.get("x", 0), spec.get("y", 0)
+            rect = RectangleF.FromLTRB (x, y, spec.get("width", 200) + x, spec.get("height", 200) + y)
+            shape = target[0].AppendShape(shape_type_by_name(spec.get("shape_type", "Rectangle")), rect)
+
+            fill_color = spec.get("fill_color")
+            if fill_color is not None:
+                shape.Fill.FillType = FillFormatType.Solid
+                shape.Fill.SolidColor.Color = colors[fill_color]
+
+            line_color = spec.get("line_color")
+            if line_color is not None:
+                shape.Line.FillType = FillFormatType.Solid
+                shape.Line.SolidFillColor.Color = colors[line_color]
+
+            if spec.get("text"):
+                shape.TextFrame.Text = spec["text"]
+
+            created.append({"slide_num": slide_num, "shape_num": target[1]})
+            target[1] += 1
+
+        #Save the document
+        presentation_cache.save(ppt,filepath)
+        return {
+            "message": f"Added {len(created)} shape(s)",
+            "shapes": created
+        }
+
+    except OperationCancelledError:
+        presentation_cache.invalidate(filepath)
+        raise
+    except Exception as e:
+        presentation_cache.invalidate(filepath)
+        message = str(e) if index is None else f"shape {index}: {e}"
+        logger.error(f"add failed: {message}")
+        raise ShapeError(message)
+
 def add_text_shape(filepath:str,slide_num:int,shape_num:int = None,text:str = "") -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
             
         slide = ppt.Slides[slide_num]
         
@@ -135,39 +255,72 @@ def add_text_shape(filepath:str,slide_num:int,shape_num:int = None,text:str = ""
             shape = slide.Shapes[shape_num]
 
         shape.TextFrame.Text = text
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"add text successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"add text failed: {e}")
         raise ShapeError(str(e))
     
-def shape_to_image(filepath:str,slide_num:int,output_filepath:str) -> dict[str,Any]:
+def shape_image_dir(output_filepath:str) -> str:
+    """Directory the shape images of shape_to_image go to: output_filepath without its extension."""
+    return output_filepath.rsplit('.', 1)[0]
+
+def shape_output_path(output_dir:str, index:int) -> str:
+    return output_dir + "//" + "ShapeToImage-"+str(index)+".png"
+
+def count_shapes(filepath:str,slide_num:int) -> int:
+    try:
+        ppt = presentation_cache.get(filepath)
+        if slide_num >= ppt.Slides.Count:
+            raise ShapeError(f"length {slide_num} greater than slide count")
+        return ppt.Slides[slide_num].Shapes.Count
+    except ShapeError as e:
+        logger.error(str(e))
+        raise
+    except Exception as e:
+        logger.error(f"failed: {e}")
+        raise ShapeError(str(e))
+
+def shape_to_image(filepath:str,slide_num:int,output_filepath:str,shape_indices:List[int] = None) -> dict[str,Any]:
+    """
+    Save shapes of a slide as png files ShapeToImage-<index>.png in shape_image_dir(output_filepath).
+
+    shape_indices limits the export to those shapes; by default every shape is saved.
+    Runs in render worker processes too, one job per shape.
+    """
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
             
         slide = ppt.Slides[slide_num]
 
-        new_path = output_filepath.rsplit('.', 1)[0]
+        new_path = shape_image_dir(output_filepath)
         
-        if not os.path.exists(new_path):
-            os.mkdir(new_path)
+        os.makedirs(new_path, exist_ok=True)
+
+        if shape_indices is None:
+            shape_indices = range(slide.Shapes.Count)
 
-        for i, unusedItem in enumerate(slide.Shapes):
-            fileName = new_path + "//" + "ShapeToImage-"+str(i)+".png"
+        output_files = []
+        for i in shape_indices:
+            check_cancelled()
+            if i < 0 or i >= slide.Shapes.Count:
+                raise ShapeError(f"length {i} greater than shape count")
+            fileName = shape_output_path(new_path, i)
             #Save shapes as images
             image = slide.Shapes.SaveAsImage(i)
             image.Save(fileName)
             image.Dispose()
+            output_files.append(fileName)
 
-        return {"message": f"successfully"}
+        return {"message": f"successfully", "output_files": output_files}
 
-    except ShapeError as e:
+    except (ShapeError, OperationCancelledError) as e:
         logger.error(str(e))
         raise
     except Exception as e:
@@ -177,8 +330,7 @@ def shape_to_image(filepath:str,slide_num:int,output_filepath:str) -> dict[str,A
 def fill_shape_with_picture(filepath:str,slide_num:int,shape_num:int,picture_url:str) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         if slide_num > ppt.Slides.Count:
                 raise ShapeError(f"length {slide_num} greater than slide count")
@@ -194,13 +346,14 @@ def fill_shape_with_picture(filepath:str,slide_num:int,shape_num:int,picture_url
         shape.Fill.PictureFill.Picture.Url = picture_url
         shape.Fill.PictureFill.FillType = PictureFillType.Stretch
 
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"add successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"add failed: {e}")
         raise ShapeError(str(e))
     
@@ -210,13 +363,13 @@ def get_shape_titles(
 ) -> dict[str,Any]:
     try:
          #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         #Instantiate a list of IShape objects
         shapelist = []
         #Loop through all sildes and all shapes on each slide
         for slide in ppt.Slides:
+            check_cancelled()
             for shape in slide.Shapes:
                 if not isinstance(shape,ISmartArt):
                     if shape.Placeholder is not None:
@@ -240,7 +393,7 @@ def get_shape_titles(
         fp.close()
         return {"message": f"add successfully"}
 
-    except ShapeError as e:
+    except (ShapeError, OperationCancelledError) as e:
         logger.error(str(e))
         raise
     except Exception as e:
@@ -254,8 +407,7 @@ def group_shapes(
 ) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
         
@@ -268,13 +420,14 @@ def group_shapes(
             shape_list.append(shape)
 
         slide.GroupShapes(shape_list)
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"add successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"add failed: {e}")
         raise ShapeError(str(e))
     
@@ -285,8 +438,7 @@ def ungroup_shapes(
 ) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
 
@@ -297,13 +449,14 @@ def ungroup_shapes(
         else:
             raise ShapeError("Shape does not belong to groupshape")
         
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"failed: {e}")
         raise ShapeError(str(e))
     
@@ -316,8 +469,7 @@ def set_alignment(
 ) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
 
@@ -333,13 +485,14 @@ def set_alignment(
 
         shape.TextFrame.Paragraphs[paragraph_num].Alignment = type1
 
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"failed: {e}")
         raise ShapeError(str(e))
 
@@ -351,8 +504,7 @@ def append_html(
 ) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
 
@@ -363,13 +515,14 @@ def append_html(
 
         shape.TextFrame.Paragraphs.AddFromHtml(code_html)
 
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"failed: {e}")
         raise ShapeError(str(e))
 
@@ -381,8 +534,7 @@ def set_autofittext(
 ) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
 
@@ -397,13 +549,14 @@ def set_autofittext(
             type1 = TextAutofitType.Shape
 
         shape.TextFrame.AutofitType = type1
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"failed: {e}")
         raise ShapeError(str(e))
 
@@ -415,8 +568,7 @@ def set_verticaltext(
 ) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
 
@@ -431,13 +583,14 @@ def set_verticaltext(
             type1 = VerticalTextType.Vertical270
 
         shape.TextFrame.VerticalTextType = type1
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"failed: {e}")
         raise ShapeError(str(e))
     
@@ -449,8 +602,7 @@ def set_text_color(
 ) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
 
@@ -466,12 +618,13 @@ def set_text_color(
                 b = int(color[4:6], 16)
                 shape.TextFrame.TextRange.Fill.SolidColor.Color = Color.FromRgb(r, g, b)
         
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"successfully"}
 
     except ShapeError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"failed: {e}")
         raise ShapeError(str(e))
\ No newline at end of file
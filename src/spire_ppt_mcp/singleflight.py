@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .cache import file_stamp
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task:asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+class Singleflight:
+    """
+    Coalesces identical concurrent calls into one execution.
+
+    The first call for a key starts the work; calls with the same key that
+    arrive while it runs wait for it and get the same result or exception.
+    The work is only cancelled once every caller waiting for it has been
+    cancelled. Keys come from request_key(), so a call on a file that
+    changed in between never shares a result computed from the old file.
+    """
+
+    def __init__(self, enabled:bool = True):
+        self.enabled = enabled
+        self.executions = 0
+        self.coalesced = 0
+        self._calls:Dict[str,_Call] = {}
+
+    @staticmethod
+    def request_key(tool:str, filepath:str, arguments:Dict[str,Any]) -> Optional[str]:
+        """
+        Key of a read-only call of tool on filepath: the tool, the resolved path,
+        the file's version on disk and the arguments. None if the file can't be stat'ed.
+        """
+        path = os.path.realpath(filepath)
+        try:
+            version = file_stamp(path)
+        except OSError:
+            return None
+        description = json.dumps({"tool": tool, "path": path, "version": version, "arguments": arguments},
+                                 sort_keys=True, default=str)
+        return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+    async def do(self, key:Optional[str], func:Callable[...,Awaitable[Any]], /, *args, **kwargs) -> Any:
+        """Await func(*args, **kwargs), or the execution already in flight for key. A None key never coalesces."""
+        if not self.enabled or key is None:
+            return await func(*args, **kwargs)
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(func(*args, **kwargs)))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Later callers start afresh rather than join the cancelled execution
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def stats(self) -> Dict[str,Any]:
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced
+        }
+
+    def _forget(self, key:str, call:_Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Retrieve the exception so an execution nobody awaited anymore isn't logged as unhandled
+        if not call.task.cancelled():
+            call.task.exception()
+
+singleflight = Singleflight()
@@ -3,6 +3,7 @@ from typing import Any
 
 from spire.presentation import *
 
+from .cache import presentation_cache
 from .exceptions import SlideError
 
 logger = logging.getLogger(__name__)
@@ -20,8 +21,7 @@ def add_image_in_master(
     Add pictures to master.
     """
     try:
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         #Get the master collection
         master = ppt.Masters[master_num]
@@ -36,7 +36,7 @@ def add_image_in_master(
         ppt.Slides.Append()
 
         # 保存更改
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
 
         return {"message": f"master add pictures successfully"}
 
@@ -44,15 +44,15 @@ def add_image_in_master(
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"Adding image failed: {e}")
         raise SlideError(str(e))
     
 def append_slide_with_master_layout(filepath: str) -> dict:
     try:
         #Create a PPT document
-        presentation = Presentation()
         #Load the document from disk
-        presentation.LoadFromFile(filepath)
+        presentation = presentation_cache.get(filepath)
         #Get the master
         master = presentation.Masters[0]
         #Get master layout slides
@@ -71,22 +71,22 @@ def append_slide_with_master_layout(filepath: str) -> dict:
         #Another way to append new slide with master layout
         presentation.Slides.Insert(2, presentation.Slides[1], master.Layouts[1])
         #Save the document
-        presentation.SaveToFile(filepath)
+        presentation_cache.save(presentation,filepath)
         return {"message": f"append successfully"}
 
     except SlideError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"Add failed: {e}")
         raise SlideError(str(e))
     
 def apply_slide_master(filepath: str, image_filepath: str) -> dict[str,Any]:
     try:
         #Create an instance of presentation document
-        ppt = Presentation()
         #Load file
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
         #Get the first slide master from the presentation
         masterSlide = ppt.Masters[0]
         #Customize the background of the slide master
@@ -102,44 +102,44 @@ def apply_slide_master(filepath: str, image_filepath: str) -> dict[str,Any]:
         masterSlide.Theme.ColorScheme.Accent4.Color = Color.get_Lavender()
         masterSlide.Theme.ColorScheme.Accent5.Color = Color.get_Black()
         #Save the document
-        ppt.SaveToFile(filepath)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"apply successfully"}
 
     except SlideError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"apply failed: {e}")
         raise SlideError(str(e))
     
 def change_slide_position(filepath: str,slide_num:int,slide_number:int) -> dict[str,Any]:
     try:
         #Create a PPT document
-        presentation = Presentation()
         #Load the document from disk
-        presentation.LoadFromFile(filepath)
+        presentation = presentation_cache.get(filepath)
         
         slide = presentation.Slides[slide_num]
         slide.SlideNumber = slide_number
         #Save the document
-        presentation.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(presentation,filepath)
         return {"message": f"change successfully"}
 
     except SlideError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"change failed: {e}")
         raise SlideError(str(e))
     
 def append_slide(filepatth:str) -> dict[str,Any]:
     try:
-        ppt = Presentation()
-        ppt.LoadFromFile(filepatth)
+        ppt = presentation_cache.get(filepatth)
 
         ppt.Slides.Append()
 
-        ppt.SaveToFile(filepatth,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepatth)
         return {"message": "append successfully",
                 "slide":"some slide information"}
 
@@ -147,24 +147,25 @@ def append_slide(filepatth:str) -> dict[str,Any]:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepatth)
         logger.error(f"append failed: {e}")
         raise SlideError(str(e))
     
 def delete_slide(filepatth:str,slide_num:int) -> dict[str,Any]:
     try:
-        ppt = Presentation()
-        ppt.LoadFromFile(filepatth)
+        ppt = presentation_cache.get(filepatth)
 
         if slide_num > ppt.Slides.Count:
             raise SlideError(f"length {slide_num} greater than slide count")
         
         ppt.Slides.RemoveAt(slide_num)
 
-        ppt.SaveToFile(filepatth,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepatth)
         return {"message": f"delete {slide_num} slide successfully"}
     except SlideError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepatth)
         logger.error(f"delete failed: {e}")
         raise SlideError(str(e))
\ No newline at end of file
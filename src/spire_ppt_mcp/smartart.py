@@ -1,12 +1,84 @@
 import logging
-from typing import Any
+from typing import Any, Iterator, Tuple
 
 from spire.presentation import *
 
-from .exceptions import SmartArtError
+from .cache import presentation_cache
+from .cancellation import check_cancelled
+from .exceptions import OperationCancelledError, SmartArtError
 
 logger = logging.getLogger(__name__)
 
+def _outline_node(item:Any, path:str) -> Tuple[str,Any]:
+    if isinstance(item, dict):
+        if "text" not in item:
+            raise SmartArtError(f"{path}: a node dict needs a 'text' key")
+        return str(item["text"]), item.get("children")
+    if isinstance(item, (str, int, float)):
+        return str(item), None
+    raise SmartArtError(f"{path}: unsupported outline item {item!r}")
+
+def outline_items(outline:Any, path:str = "outline") -> Iterator[Tuple[str,Any,str]]:
+    """
+    The (text, children, path) nodes of one level of an outline.
+
+    A level is a list of nodes, where a node is a string, a {"text": ...,
+    "children": [...]} dict, or a string followed by a nested list of its
+    children; or a dict mapping node texts to their children.
+    """
+    if isinstance(outline, dict) and "text" not in outline:
+        for index, (text, children) in enumerate(outline.items()):
+            yield str(text), children, f"{path}[{index}]"
+        return
+    if isinstance(outline, dict):
+        outline = [outline]
+    if not isinstance(outline, list):
+        raise SmartArtError(f"{path}: expected a list or dict, got {outline!r}")
+    pending = None
+    for index, item in enumerate(outline):
+        item_path = f"{path}[{index}]"
+        if isinstance(item, list):
+            if pending is None or pending[1] is not None:
+                raise SmartArtError(f"{item_path}: a nested list must follow the node it belongs to")
+            yield pending[0], item, pending[2]
+            pending = None
+            continue
+        if pending is not None:
+            yield pending
+        pending = (*_outline_node(item, item_path), item_path)
+    if pending is not None:
+        yield pending
+
+def build_nodes(smartart:ISmartArt, outline:Any) -> dict[str,int]:
+    """
+    Replace the SmartArt's sample nodes with the nodes of outline, depth first in one pass.
+
+    Returns the number of nodes added and the outline's depth.
+    """
+    nodes = smartart.Nodes
+    for index in range(nodes.Count - 1, -1, -1):
+        nodes.RemoveNodeByPosition(index)
+
+    count = depth = 0
+    stack = [(nodes, outline_items(outline))]
+    while stack:
+        collection, items = stack[-1]
+        item = next(items, None)
+        if item is None:
+            stack.pop()
+            continue
+        check_cancelled()
+        text, children, path = item
+        node = collection.AddNode()
+        node.TextFrame.Text = text
+        count += 1
+        depth = max(depth, len(stack))
+        if children:
+            stack.append((node.ChildNodes, outline_items(children, path)))
+    if count == 0:
+        raise SmartArtError("The outline has no nodes")
+    return {"nodes": count, "depth": depth}
+
 def create_smartart(
         filepath:str,
         slide_num:int,
@@ -14,12 +86,16 @@ def create_smartart(
         y:float = 0,
         width:float = 200,
         height:float = 200,
-        layout_type:str = "Gear"
+        layout_type:str = "Gear",
+        outline:Any = None
 ) -> dict[str,Any]:
+    """
+    Append a SmartArt graphic. With outline, its nodes are built from the
+    outline instead of the layout's sample nodes.
+    """
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
 
@@ -31,15 +107,24 @@ def create_smartart(
         if type1 == None:
             type1 = SmartArtLayoutType.Gear
 
-        slide.Shapes.AppendSmartArt(x,y,width,height,type1)
+        smartart = slide.Shapes.AppendSmartArt(x,y,width,height,type1)
+
+        result = {"message": f"add successfully"}
+        if outline is not None:
+            result.update(build_nodes(smartart, outline))
 
         #Save the document
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
-        return {"message": f"add successfully"}
+        presentation_cache.save(ppt,filepath)
+        return result
 
     except SmartArtError as e:
+        presentation_cache.invalidate(filepath)
         logger.error(str(e))
         raise
+    except OperationCancelledError:
+        presentation_cache.invalidate(filepath)
+        raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"add failed: {e}")
         raise SmartArtError(str(e))
\ No newline at end of file
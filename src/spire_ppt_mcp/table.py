@@ -1,12 +1,147 @@
+import csv
 import logging
-from typing import Any
+import time
+from itertools import islice
+from math import ceil
+from typing import Any, Iterable, Iterator, Optional, Tuple
+from unicodedata import east_asian_width
 
 from spire.presentation import *
 
-from .exceptions import TableError
+from .cache import presentation_cache
+from .cancellation import check_cancelled
+from .exceptions import OperationCancelledError, TableError
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional: without it data is a list of rows or a CSV file
+    numpy = None
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_ROWS = 1000
+
+# Row height fit model, in points: PowerPoint's default table font size and
+# cell margins, and the average character width and line spacing relative
+# to the font size
+DEFAULT_FONT_SIZE = 18
+CELL_MARGIN_X = 7.2
+CELL_MARGIN_Y = 3.6
+FIT_CHAR_WIDTH = 0.55
+FIT_LINE_SPACING = 1.2
+
+def _is_array(data:Any) -> bool:
+    return numpy is not None and isinstance(data, numpy.ndarray)
+
+def _cell_text(value:Any) -> str:
+    return "" if value is None else str(value)
+
+def iter_table_rows(data:Any = None, csv_path:str = None, encoding:str = "utf-8-sig") -> Iterator[List[str]]:
+    """
+    Rows of cell texts from a 2D list, a NumPy array or a CSV file, one row at a time.
+
+    A structured NumPy array yields its field names as the first row. A CSV
+    file is read as it is consumed, so it is never held in memory whole.
+    """
+    if (data is None) == (csv_path is None):
+        raise TableError("Pass exactly one of data or csv_path")
+    if csv_path is not None:
+        with open(csv_path, newline="", encoding=encoding) as csv_file:
+            for row in csv.reader(csv_file):
+                yield row
+        return
+    if _is_array(data):
+        if data.dtype.names:
+            yield list(data.dtype.names)
+            for record in data:
+                yield [_cell_text(value) for value in record.tolist()]
+            return
+        if data.ndim != 2:
+            raise TableError(f"data must be a 2D array, got {data.ndim} dimension(s)")
+        for row in data:
+            yield [_cell_text(value) for value in row.tolist()]
+        return
+    for index, row in enumerate(data):
+        if isinstance(row, (str, bytes)) or not isinstance(row, Iterable):
+            raise TableError(f"row {index} is not a list of cells")
+        yield [_cell_text(value) for value in row]
+
+def table_shape(data:Any = None, csv_path:str = None, encoding:str = "utf-8-sig") -> Tuple[int,int]:
+    """Number of rows and columns of a table source. Counts a CSV file in one streaming pass."""
+    if _is_array(data) and data.ndim == 2 and not data.dtype.names:
+        return data.shape
+    if _is_array(data) and data.dtype.names:
+        return len(data) + 1, len(data.dtype.names)
+    row_count = col_count = 0
+    for row in iter_table_rows(data, csv_path, encoding):
+        row_count += 1
+        col_count = max(col_count, len(row))
+    return row_count, col_count
+
+def chunked(rows:Iterable[List[str]], chunk_rows:int) -> Iterator[List[List[str]]]:
+    """Group rows into lists of at most chunk_rows rows."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+def _set_font_size(cell:Any, text:str, font_size:float) -> None:
+    paragraphs = cell.TextFrame.Paragraphs
+    for index in range(paragraphs.Count if "\n" in text else 1):
+        for text_range in paragraphs[index].TextRanges:
+            text_range.FontHeight = font_size
+
+def write_rows(table:ITable, rows:Iterable[List[str]], first_row:int = 0, chunk_rows:int = DEFAULT_CHUNK_ROWS,
+               font_size:float = None) -> int:
+    """
+    Write rows into table starting at first_row and return the number of cells written.
+
+    Each row object is looked up once and cells that stay empty are skipped,
+    since a new table's cells are already empty. The rows are consumed chunk
+    by chunk, checking for cancellation in between. With font_size, the
+    written text gets that size.
+    """
+    cells = 0
+    row_index = first_row
+    for chunk in chunked(rows, chunk_rows):
+        check_cancelled()
+        for values in chunk:
+            table_row = table.TableRows[row_index]
+            for col_index, text in enumerate(values):
+                if text:
+                    cell = table_row[col_index]
+                    cell.TextFrame.Text = text
+                    if font_size is not None:
+                        _set_font_size(cell, text, font_size)
+            cells += len(values)
+            row_index += 1
+    return cells
+
+def _text_width(text:str) -> float:
+    # In average character advances; East Asian wide characters take two
+    return sum(2 if east_asian_width(char) in ("W", "F") else 1 for char in text)
+
+def fit_row_height(values:List[str], widths:List[float], font_size:float) -> float:
+    """
+    Estimated height a row needs for its text to fit without growing.
+
+    Each cell's text is wrapped at the number of average characters that fit
+    between the cell margins; the row is as tall as its tallest cell. Empty
+    cells keep PowerPoint's default font, so they count as one line of it.
+    """
+    char_width = font_size * FIT_CHAR_WIDTH
+    lines_height = 0.0
+    for text, width in zip(values, widths):
+        if not text:
+            lines_height = max(lines_height, DEFAULT_FONT_SIZE * FIT_LINE_SPACING)
+            continue
+        chars_per_line = max(1, int((width - 2 * CELL_MARGIN_X) // char_width))
+        lines = sum(max(1, ceil(_text_width(line) / chars_per_line)) for line in text.split("\n"))
+        lines_height = max(lines_height, lines * font_size * FIT_LINE_SPACING)
+    return lines_height + 2 * CELL_MARGIN_Y
+
 def create_table(
         filepath:str,
         slide_num:int,
@@ -17,8 +152,7 @@ def create_table(
 ) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
         print(widths)
@@ -26,13 +160,14 @@ def create_table(
         slide.Shapes.AppendTable(x,y,widths,heights)
 
         #Save the document
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {"message": f"add successfully"}
 
     except TableError as e:
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"add failed: {e}")
         raise TableError(str(e))
 
@@ -44,8 +179,7 @@ def add_text_table(
 ) -> dict[str,Any]:
     try:
         #Create a PPT document
-        ppt = Presentation()
-        ppt.LoadFromFile(filepath)
+        ppt = presentation_cache.get(filepath)
 
         slide = ppt.Slides[slide_num]
 
@@ -72,7 +206,7 @@ def add_text_table(
                     table[j,i].TextFrame.Text = data_2d[i][j]
 
         #Save the document
-        ppt.SaveToFile(filepath,FileFormat.Pptx2019)
+        presentation_cache.save(ppt,filepath)
         return {
             "success": True,
             "message": "Table content initialized successfully."
@@ -82,6 +216,176 @@ def add_text_table(
         logger.error(str(e))
         raise
     except Exception as e:
+        presentation_cache.invalidate(filepath)
         logger.error(f"add failed: {e}")
         raise TableError(str(e))
 
+
+def fill_table(
+        filepath:str,
+        slide_num:int,
+        data:Any = None,
+        csv_path:str = None,
+        x:float = 0,
+        y:float = 0,
+        widths:Optional[List[float]] = None,
+        row_height:float = 20,
+        chunk_rows:int = DEFAULT_CHUNK_ROWS,
+        encoding:str = "utf-8-sig"
+) -> dict[str,Any]:
+    """
+    Create a table sized to data or csv_path and fill it, with one load and one save.
+
+    Without widths the columns share the slide width right of x equally.
+    Short rows leave their remaining cells empty.
+    """
+    try:
+        if chunk_rows < 1:
+            raise TableError("chunk_rows must be at least 1")
+        row_count, col_count = table_shape(data, csv_path, encoding)
+        if row_count == 0 or col_count == 0:
+            raise TableError("The table data is empty")
+
+        ppt = presentation_cache.get(filepath)
+        slide = ppt.Slides[slide_num]
+
+        if widths is None:
+            column_width = (ppt.SlideSize.Size.Width - x) / col_count
+            widths = [column_width] * col_count
+        elif len(widths) != col_count:
+            raise TableError(f"widths has {len(widths)} column(s) but the data has {col_count}")
+
+        started = time.perf_counter()
+        table = slide.Shapes.AppendTable(x, y, widths, [row_height] * row_count)
+        cells = write_rows(table, iter_table_rows(data, csv_path, encoding), chunk_rows=chunk_rows)
+        elapsed = time.perf_counter() - started
+
+        presentation_cache.save(ppt,filepath)
+        return {
+            "success": True,
+            "message": f"Created a {row_count}x{col_count} table on slide {slide_num}",
+            "rows": row_count,
+            "columns": col_count,
+            "cells": cells,
+            "elapsed_seconds": round(elapsed, 3),
+            "cells_per_second": round(cells / elapsed, 1) if elapsed > 0 else None
+        }
+
+    except TableError as e:
+        logger.error(str(e))
+        raise
+    except OperationCancelledError:
+        # Drop the half-filled table
+        presentation_cache.invalidate(filepath)
+        raise
+    except Exception as e:
+        presentation_cache.invalidate(filepath)
+        logger.error(f"fill failed: {e}")
+        raise TableError(str(e))
+
+def paginate_table(
+        filepath:str,
+        slide_num:int,
+        data:Iterable[Any] = None,
+        csv_path:str = None,
+        x:float = 0,
+        y:float = 0,
+        widths:Optional[List[float]] = None,
+        header:bool = True,
+        font_size:float = 12,
+        bottom_margin:Optional[float] = None,
+        encoding:str = "utf-8-sig"
+) -> dict[str,Any]:
+    """
+    Stream a table of any length onto slide slide_num and as many new slides after it as needed.
+
+    Rows are read one page at a time, so a CSV file or row iterator is never
+    held in memory whole. Each row's height comes from fit_row_height() and
+    a page takes rows until the next one would cross the bottom margin (y
+    by default). With header, the first row is repeated at the top of every
+    page. The number of columns is that of the first row.
+    """
+    try:
+        ppt = presentation_cache.get(filepath)
+        slide = ppt.Slides[slide_num]
+        # Continuation pages are inserted right after the previous page, with the first page's layout
+        layout = slide.Layout
+        slide_size = ppt.SlideSize.Size
+        page_bottom = slide_size.Height - (y if bottom_margin is None else bottom_margin)
+
+        rows = iter_table_rows(data, csv_path, encoding)
+        first = next(rows, None)
+        if not first:
+            raise TableError("The table data is empty")
+        col_count = len(first)
+        if widths is None:
+            widths = [(slide_size.Width - x) / col_count] * col_count
+        elif len(widths) != col_count:
+            raise TableError(f"widths has {len(widths)} column(s) but the data has {col_count}")
+
+        def fitted(values:List[str], index:int) -> Tuple[List[str],float]:
+            if len(values) > col_count:
+                raise TableError(f"row {index} has {len(values)} cells but the table has {col_count} columns")
+            values = values + [""] * (col_count - len(values))
+            return values, fit_row_height(values, widths, font_size)
+
+        header_row = fitted(first, 0) if header else None
+        pending = None if header else fitted(first, 0)
+        row_number = 1
+
+        started = time.perf_counter()
+        slides = []
+        data_rows = cells = 0
+        while True:
+            check_cancelled()
+            page = [header_row] if header_row else []
+            height = y + sum(row_height for _, row_height in page)
+            while True:
+                if pending is None:
+                    values = next(rows, None)
+                    if values is None:
+                        break
+                    pending = fitted(values, row_number)
+                    row_number += 1
+                # A row taller than a whole page still gets a page of its own
+                if height + pending[1] > page_bottom and len(page) > (1 if header_row else 0):
+                    break
+                page.append(pending)
+                height += pending[1]
+                pending = None
+
+            if slides:
+                index = slide_num + len(slides)
+                ppt.Slides.Insert(index, layout)
+                slide = ppt.Slides[index]
+            table = slide.Shapes.AppendTable(x, y, widths, [row_height for _, row_height in page])
+            cells += write_rows(table, (values for values, _ in page), chunk_rows=len(page), font_size=font_size)
+            data_rows += len(page) - (1 if header_row else 0)
+            slides.append(slide_num + len(slides))
+            if pending is None:
+                break
+        elapsed = time.perf_counter() - started
+
+        presentation_cache.save(ppt,filepath)
+        return {
+            "success": True,
+            "message": f"Added {data_rows} row(s) on {len(slides)} slide(s)",
+            "slides": slides,
+            "rows": data_rows,
+            "columns": col_count,
+            "cells": cells,
+            "elapsed_seconds": round(elapsed, 3),
+            "cells_per_second": round(cells / elapsed, 1) if elapsed > 0 else None
+        }
+
+    except TableError as e:
+        presentation_cache.invalidate(filepath)
+        logger.error(str(e))
+        raise
+    except OperationCancelledError:
+        presentation_cache.invalidate(filepath)
+        raise
+    except Exception as e:
+        presentation_cache.invalidate(filepath)
+        logger.error(f"paginate failed: {e}")
+        raise TableError(str(e))